@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import random
+import string
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+import adblock
+
+
+def generate_list(count, seed=0):
+    # Roughly the mix of EasyList plus EasyPrivacy: mostly domain rules, then url patterns, cosmetic
+    # rules the network filter skips, a few exceptions and option heavy rules
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(4000)]
+    tlds = ['com', 'net', 'org', 'io', 'co.uk', 'de']
+    lines = ['[Adblock Plus 2.0]', '! Title: Synthetic list']
+    for i in range(count):
+        kind = rng.random()
+        domain = f"{rng.choice(words)}{rng.choice(['', 'ads', '-track', 'metrics'])}.{rng.choice(tlds)}"
+        if kind < 0.45:
+            lines.append(f"||{domain}^" + rng.choice(['', '', '$third-party', '$script,third-party', '$image']))
+        elif kind < 0.75:
+            sep = rng.choice(['/', '-', '_', '.', '&', '?'])
+            pattern = rng.choice([
+                f"{sep}{rng.choice(words)}{sep}{rng.choice(words)}.",
+                f"/{rng.choice(words)}/ads/*",
+                f"||{domain}/{rng.choice(words)}/",
+                f"{sep}ad{sep}{rng.choice(words)}{sep}",
+                f"&{rng.choice(words)}_id=",
+                f"/{rng.choice(words)}.js|",
+            ])
+            lines.append(pattern + rng.choice(['', '', '$script', '$domain=' + domain, '$~image']))
+        elif kind < 0.95:
+            lines.append(f"{rng.choice(['', domain])}##.{rng.choice(words)}-ad")
+        else:
+            lines.append(f"@@||{domain}/{rng.choice(words)}^" + rng.choice(['', '$image', '$document']))
+    return lines, words
+
+
+def generate_requests(count, words, seed=1):
+    rng = random.Random(seed)
+    pages = [f"www.{rng.choice(words)}.{rng.choice(['com', 'org', 'net'])}" for _ in range(200)]
+    kinds = list(adblock.TYPES.values())
+    for _ in range(count):
+        page = rng.choice(pages)
+        host = rng.choice([page, f"cdn.{page.removeprefix('www.')}", f"{rng.choice(words)}.{rng.choice(['com', 'net', 'io'])}"])
+        path = '/'.join(rng.choices(words, k=rng.randint(1, 4)))
+        query = f"?{rng.choice(words)}={rng.randint(0, 99999)}&v={rng.randint(0, 9)}" if rng.random() < 0.4 else ''
+        yield f"https://{host}/{path}.{rng.choice(['js', 'png', 'css', 'gif', 'json'])}{query}", host, page, rng.choice(kinds)
+
+
+def main(rules=60_000, requests=50_000):
+    lines, words = generate_list(rules)
+    with tempfile.TemporaryDirectory() as temp:
+        with open(os.path.join(temp, 'list.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        cache = os.path.join(temp, 'adblock.cache')
+
+        start = time.perf_counter()
+        filters = adblock.load(temp, cache)
+        print(f"compile: {len(filters)} network rules from {len(lines)} lines in {(time.perf_counter() - start) * 1000:.0f} ms")
+        start = time.perf_counter()
+        filters = adblock.load(temp, cache)
+        print(f"cached load: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Patterns compile on first use, so the first pass pays for that and later ones show steady state
+    requests = list(generate_requests(requests, words))
+    for name in ('first pass', 'steady'):
+        timings = []
+        blocked = 0
+        for url, host, page, kind in requests:
+            start = time.perf_counter()
+            blocked += filters.blocked(url, host, page, kind)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"{name}: p50 {statistics.median(timings):.1f} us, p99 {p99:.1f} us, max {timings[-1]:.1f} us "
+              f"over {len(timings)} requests, {blocked} blocked")
+    return 1 if p99 >= 100 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SRC = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src')
+SCENARIOS = ('startup', 'tabs', 'history', 'tables')
+TABS = 50
+HISTORY_SIZES = (0, 10_000, 50_000, 100_000)
+HISTORY_WRITES = 200
+BOOKMARKS = 10_000
+BOOKMARK_FOLDERS = 100
+
+
+# Fixture server
+
+def fixture_page(number, rng):
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(3000)]
+    paragraphs = ''.join(f"<p>{' '.join(rng.choices(words, k=60))}</p>" for _ in range(40))
+    return (
+        f"<!DOCTYPE html><html><head><title>Fixture {number}</title>"
+        "<style>body { font-family: sans-serif; max-width: 50em; margin: auto; } p { line-height: 1.4; }</style>"
+        "</head><body>"
+        f"<h1>Fixture {number}</h1>{paragraphs}"
+        "<script>document.body.dataset.ready = [...document.querySelectorAll('p')].length;</script>"
+        "</body></html>"
+    ).encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # /page/<n> is a text heavy page, the same bytes on every request so warm runs can use the cache
+    def do_GET(self):
+        _, _, name = self.path.rpartition('/')
+        if not self.path.startswith('/page/') or not name.isdigit():
+            self.send_error(404)
+            return
+        body = fixture_page(name, random.Random(int(name)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Scenarios, each run in its own browser process
+
+def summary(values):
+    values = sorted(values)
+    return {'p50': round(statistics.median(values), 3), 'p90': round(values[int(len(values) * 0.9)], 3), 'max': round(values[-1], 3)}
+
+
+def run_until(app, done, timeout=30):
+    from PySide6 import QtCore
+    end = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() > end:
+            raise TimeoutError("timed out waiting for the browser")
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 50)
+
+
+def wait_loaded(browser, tab, timeout=30):
+    loaded = []
+    tab.loadFinished.connect(lambda ok: loaded.append(ok))
+    run_until(browser.app, lambda: loaded, timeout)
+    return loaded[0]
+
+
+def memory(windows):
+    # Proportional set size of the browser and every renderer its tabs use, shared pages split between them
+    from tasks import process_stats
+    pids = {os.getpid()}
+    for window in windows:
+        for i in range(window.tabs.count()):
+            page = getattr(window.tabs.widget(i), 'page', lambda: None)()
+            if page and page.renderProcessPid():
+                pids.add(page.renderProcessPid())
+    return sum(process_stats(pid)[1] or 0 for pid in pids) / 1024 ** 2
+
+
+def scenario_startup(browser, port, start):
+    window = browser.MainWindow(f"http://127.0.0.1:{port}/page/0")
+    wait_loaded(browser, window.tabs.currentWidget())
+    return {'first_tab_ms': round((time.time() - start) * 1000, 1), 'memory_mb': round(memory([window]), 1)}
+
+
+def scenario_tabs(browser, port, start):
+    window = browser.MainWindow(f"http://127.0.0.1:{port}/page/0")
+    wait_loaded(browser, window.tabs.currentWidget())
+    browser.app.processEvents()
+    base = memory([window])
+
+    created, loaded, results = [], [], {}
+    for i in range(1, TABS + 1):
+        before = time.perf_counter()
+        window.new_tab(f"http://127.0.0.1:{port}/page/{i}")
+        created.append((time.perf_counter() - before) * 1000)
+        wait_loaded(browser, window.tabs.widget(window.tabs.count() - 1))
+        loaded.append((time.perf_counter() - before) * 1000)
+        if i in (1, 10, TABS):
+            results[f'memory_{i}_tabs_mb'] = round(memory([window]), 1)
+    return results | {
+        'new_tab_ms': summary(created),
+        'tab_loaded_ms': summary(loaded),
+        'memory_per_tab_mb': round((results[f'memory_{TABS}_tabs_mb'] - base) / TABS, 1),
+    }
+
+
+def scenario_history(browser, port, start):
+    # The store is grown in bulk, then timed through the same path a finished page load takes
+    store = browser.history_store
+    rng = random.Random(0)
+    results = {}
+    for size in HISTORY_SIZES:
+        count = store.count()
+        with store.db:
+            for i in range(count, size):
+                store.insert(f"Title {i}", f"https://site{rng.randint(0, size // 10)}.test/{i}", time.time() - rng.random() * 86400 * 365)
+        timings = []
+        for i in range(HISTORY_WRITES):
+            before = time.perf_counter()
+            browser.history.add(f"Visit {i}", f"http://127.0.0.1:{port}/page/{i}")
+            timings.append((time.perf_counter() - before) * 1000)
+        results[f'add_at_{size}_ms'] = summary(timings)
+    return results
+
+
+def scenario_tables(browser, port, start):
+    from bookmarks import BookmarkMenu
+    rng = random.Random(0)
+    store = browser.bookmark_store
+    with store.db:
+        folders = [store.insert(f"Folder {i}") for i in range(BOOKMARK_FOLDERS)]
+        for i in range(BOOKMARKS):
+            store.insert(f"Bookmark {i}", f"https://bookmark{i}.test/", rng.choice(folders + [0]), ['bench'])
+    with browser.history_store.db:
+        for i in range(HISTORY_SIZES[-1]):
+            browser.history_store.insert(f"Title {i}", f"https://site{i % 5000}.test/{i}", time.time() - i)
+
+    results = {}
+    before = time.perf_counter()
+    browser.bookmarks.reload()
+    results['bookmarks_reload_ms'] = round((time.perf_counter() - before) * 1000, 1)
+
+    window = browser.MainWindow(f"http://127.0.0.1:{port}/page/0")
+    wait_loaded(browser, window.tabs.currentWidget())
+    menu = window.bookmarks_menu.findChild(BookmarkMenu)
+    timings = []
+    for _ in range(20):
+        menu.invalidate()
+        before = time.perf_counter()
+        window.bookmarks_menu.aboutToShow.emit()
+        timings.append((time.perf_counter() - before) * 1000)
+    results['bookmarks_menu_ms'] = summary(timings)
+
+    for data, name in ((browser.bookmarks, 'bookmarks'), (browser.history, 'history')):
+        before = time.perf_counter()
+        window.table_window(data)
+        browser.app.processEvents()
+        results[f'{name}_table_open_ms'] = round((time.perf_counter() - before) * 1000, 1)
+        table = browser.bookmarks_window if data is browser.bookmarks else browser.history_window
+        timings = []
+        for query in ('1', '12', '123', 'site4', 'title 99', ''):
+            table.search.setText(query)
+            before = time.perf_counter()
+            table.filter()
+            browser.app.processEvents()
+            timings.append((time.perf_counter() - before) * 1000)
+        results[f'{name}_table_filter_ms'] = summary(timings)
+        table.close()
+    return results
+
+
+def child(name, port, start):
+    sys.path.insert(0, SRC)
+    import browser
+    result = globals()[f'scenario_{name}'](browser, port, start)
+    print(json.dumps(result), flush=True)
+    for window in list(browser.windows):
+        window.close()
+    browser.instance.close()
+    browser.history_store.close()
+
+
+# Runner
+
+def run_scenario(name, port, data, timeout=600):
+    env = os.environ | {'WEBX_DATA': data, 'QT_QPA_PLATFORM': 'offscreen'}
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        # Chromium refuses to sandbox renderers as root, as in most containers
+        env['QTWEBENGINE_DISABLE_SANDBOX'] = '1'
+    start = time.time()
+    process = subprocess.run(
+        [sys.executable, os.path.realpath(__file__), '--child', name, '--port', str(port), '--start', str(start)],
+        env=env, capture_output=True, text=True, timeout=timeout
+    )
+    lines = process.stdout.strip().splitlines()
+    if process.returncode or not lines:
+        raise RuntimeError(f"{name} failed with {process.returncode}:\n{process.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat |= flatten(value, f"{prefix}{key}.")
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(metrics, baseline, threshold):
+    # Every metric is a time or a size, so larger is worse
+    regressions = []
+    for name, old in sorted(baseline.items()):
+        new = metrics.get(name)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        flag = ' REGRESSION' if change > threshold else ''
+        print(f"{name:55} {old:10.1f} -> {new:10.1f} {change:+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the browser offscreen against a local fixture server")
+    parser.add_argument('scenarios', nargs='*', choices=SCENARIOS, help=f"any of {', '.join(SCENARIOS)}, all by default")
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'results', f"{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown over the baseline, 0.2 is 20%%")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--start', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.port, args.start)
+        return 0
+
+    server = serve()
+    port = server.server_address[1]
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        with tempfile.TemporaryDirectory() as data:
+            if name == 'startup':
+                # Cold starts with an empty data folder, warm reuses what the cold run left behind
+                results['startup'] = {'cold': run_scenario(name, port, data), 'warm': run_scenario(name, port, data)}
+            else:
+                results[name] = run_scenario(name, port, data)
+        print(f"{name}: {json.dumps(results[name])}")
+    server.shutdown()
+
+    metrics = flatten(results)
+    os.makedirs(os.path.dirname(os.path.realpath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'time': time.time(), 'python': sys.version.split()[0], 'metrics': metrics}, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(metrics, json.load(f)['metrics'], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import random
+import string
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+from omnibox import FrecencyIndex
+
+
+def generate(count, seed=0):
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(5000)]
+    hosts = [f"{rng.choice(words)}.{rng.choice(['com', 'org', 'net', 'io'])}" for _ in range(count // 20)]
+    now = time.time()
+    for i in range(count):
+        path = '/'.join(rng.choices(words, k=rng.randint(1, 3)))
+        title = ' '.join(rng.choices(words, k=rng.randint(2, 6))).title()
+        yield f"https://{rng.choice(hosts)}/{path}", title, rng.randint(1, 50), now - rng.random() * 365 * 86400
+
+
+def main(count=100_000, keystrokes=2000):
+    rows = list(generate(count))
+    start = time.perf_counter()
+    index = FrecencyIndex()
+    index.load(rows)
+    print(f"build: {len(index)} entries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Type out prefixes of real urls and titles, plus misses, one keystroke at a time
+    rng = random.Random(1)
+    queries = []
+    while len(queries) < keystrokes:
+        url, title, *_ = rng.choice(rows)
+        target = rng.choice([url.removeprefix('https://'), title.lower(), 'zqxj' + title.lower()])
+        queries += [target[:n] for n in range(1, min(len(target), 12) + 1)]
+
+    timings = []
+    for query in queries[:keystrokes]:
+        start = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"search: p50 {statistics.median(timings):.3f} ms, p99 {timings[int(len(timings) * 0.99)]:.3f} ms, "
+          f"max {timings[-1]:.3f} ms over {len(timings)} keystrokes")
+    slow = timings[int(len(timings) * 0.99)] >= 1.0
+
+    start = time.perf_counter()
+    for url, title, *_ in rows[:1000]:
+        index.visit(url, title)
+    print(f"visit: {(time.perf_counter() - start):.3f} ms per visit")
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,315 @@
+import os
+import re
+import sys
+import glob
+import pickle
+
+from PySide6 import QtWebEngineCore
+
+
+CACHE_VERSION = 1
+TOKEN = re.compile(r"[a-z0-9%]{2,}")
+SEPARATOR = r"(?:[^\w.%-]|$)"
+# Tokens found in nearly every url make poor index keys
+COMMON = {'http', 'https', 'www', 'com', 'net', 'org', 'js', 'html', 'php', 'cdn', 'static'}
+TYPES = {
+    'script': 1, 'image': 2, 'stylesheet': 4, 'object': 8, 'xmlhttprequest': 16, 'subdocument': 32,
+    'ping': 64, 'media': 128, 'font': 256, 'websocket': 512, 'other': 1024, 'document': 2048,
+}
+ALL_TYPES = sum(TYPES.values()) & ~TYPES['document']
+ALIASES = {'xhr': 'xmlhttprequest', 'frame': 'subdocument', 'css': 'stylesheet', '1p': '~third-party', '3p': 'third-party'}
+# Options that change what a rule does instead of where it applies, such rules are left out
+UNSUPPORTED = {'match-case', 'popup', 'csp', 'redirect', 'redirect-rule', 'rewrite', 'removeparam', 'replace', 'header', 'generichide', 'elemhide', 'genericblock', 'specifichide', 'webrtc', 'permissions'}
+
+Resource = QtWebEngineCore.QWebEngineUrlRequestInfo.ResourceType
+RESOURCE_TYPES = {
+    Resource.ResourceTypeScript: TYPES['script'],
+    Resource.ResourceTypeImage: TYPES['image'],
+    Resource.ResourceTypeFavicon: TYPES['image'],
+    Resource.ResourceTypeStylesheet: TYPES['stylesheet'],
+    Resource.ResourceTypeObject: TYPES['object'],
+    Resource.ResourceTypePluginResource: TYPES['object'],
+    Resource.ResourceTypeXhr: TYPES['xmlhttprequest'],
+    Resource.ResourceTypeSubFrame: TYPES['subdocument'],
+    Resource.ResourceTypePing: TYPES['ping'],
+    Resource.ResourceTypeCspReport: TYPES['ping'],
+    Resource.ResourceTypeMedia: TYPES['media'],
+    Resource.ResourceTypeFontResource: TYPES['font'],
+    Resource.ResourceTypeSubResource: TYPES['other'],
+    Resource.ResourceTypePrefetch: TYPES['other'],
+    Resource.ResourceTypeWorker: TYPES['script'],
+    Resource.ResourceTypeSharedWorker: TYPES['script'],
+    Resource.ResourceTypeServiceWorker: TYPES['script'],
+    Resource.ResourceTypeUnknown: TYPES['other'],
+}
+
+
+def base_domain(host):
+    return '.'.join(host.rsplit('.', 2)[-2:])
+
+
+class Rule:
+    __slots__ = ('source', 'plain', 'compiled', 'types', 'third_party', 'domains', 'not_domains')
+
+    def __init__(self, source=None, plain=False, types=ALL_TYPES, third_party=None, domains=(), not_domains=()):
+        # source is a substring of the lowercase url when plain, otherwise its regex, None for rules
+        # that only name a domain
+        self.source = source
+        self.plain = plain
+        self.compiled = None
+        self.types = types
+        self.third_party = third_party
+        self.domains = frozenset(domains)
+        self.not_domains = frozenset(not_domains)
+
+    def __getstate__(self):
+        return (self.source, self.plain, self.types, self.third_party, self.domains, self.not_domains)
+
+    def __setstate__(self, state):
+        self.source, self.plain, self.types, self.third_party, self.domains, self.not_domains = state
+        self.compiled = None
+
+    def on(self, source, domains):
+        # True when the page host or one of its parents is in domains
+        while source:
+            if source in domains:
+                return True
+            source = source.partition('.')[2]
+        return False
+
+    def applies(self, url, kind, third_party, source):
+        if not self.types & kind:
+            return False
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        if self.domains and not self.on(source, self.domains):
+            return False
+        if self.not_domains and self.on(source, self.not_domains):
+            return False
+        if self.source is None:
+            return True
+        if self.plain:
+            return self.source in url
+        # Patterns are compiled on first use, most of a list never matches a token of a real url
+        if self.compiled is None:
+            self.compiled = re.compile(self.source)
+        return self.compiled.search(url) is not None
+
+
+class Matcher:
+    def __init__(self):
+        # trie maps reversed host labels to children, '' holds the rules ending at that label
+        self.trie = {}
+        self.tokens = {}
+        self.generic = []
+
+    def __len__(self):
+        return len(self.generic) + sum(map(len, self.tokens.values())) + self.count(self.trie)
+
+    def count(self, node):
+        return sum(len(v) if k == '' else self.count(v) for k, v in node.items())
+
+    def add_domain(self, domain, rule):
+        node = self.trie
+        for label in reversed(domain.split('.')):
+            node = node.setdefault(label, {})
+        node.setdefault('', []).append(rule)
+
+    def add_pattern(self, token, rule):
+        if token:
+            self.tokens.setdefault(token, []).append(rule)
+        else:
+            self.generic.append(rule)
+
+    def match(self, url, host, tokens, kind, third_party, source):
+        node = self.trie
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            for rule in node.get('', ()):
+                if rule.applies(url, kind, third_party, source):
+                    return rule
+        for token in tokens:
+            for rule in self.tokens.get(token, ()):
+                if rule.applies(url, kind, third_party, source):
+                    return rule
+        for rule in self.generic:
+            if rule.applies(url, kind, third_party, source):
+                return rule
+        return None
+
+
+def pattern_to_regex(pattern):
+    regex = ''
+    if pattern.startswith('||'):
+        regex, pattern = r'^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?', pattern[2:]
+    elif pattern.startswith('|'):
+        regex, pattern = '^', pattern[1:]
+    end = '$' if pattern.endswith('|') else ''
+    pattern = pattern.rstrip('|')
+    for part in re.split(r'(\*|\^)', pattern):
+        regex += {'*': '.*', '^': SEPARATOR}.get(part, re.escape(part))
+    return regex + end
+
+
+def pattern_token(pattern):
+    # The longest token that has to appear whole in a matching url, so the rule can be indexed by it
+    best = None
+    anchored = pattern.startswith('|')
+    body = pattern.lstrip('|').rstrip('|')
+    for match in TOKEN.finditer(body):
+        start, end = match.span()
+        if (start == 0 and not anchored) or (start > 0 and body[start - 1] == '*'):
+            continue
+        if (end == len(body) and not pattern.endswith('|')) or (end < len(body) and body[end] == '*'):
+            continue
+        if best is None or (best in COMMON, -len(best)) > (match.group() in COMMON, -len(match.group())):
+            best = match.group()
+    return best or ''
+
+
+def parse_options(text):
+    options = {'types': 0, 'not_types': 0, 'third_party': None, 'domains': [], 'not_domains': []}
+    for option in text.split(','):
+        option = option.strip().lower()
+        negated = option.startswith('~')
+        name = ALIASES.get(option.lstrip('~'), option.lstrip('~'))
+        if name.startswith('~'):
+            negated, name = not negated, name[1:]
+        if name in TYPES:
+            options['not_types' if negated else 'types'] |= TYPES[name]
+        elif name == 'third-party':
+            options['third_party'] = not negated
+        elif name.startswith('domain='):
+            for domain in name[7:].split('|'):
+                if domain.startswith('~'):
+                    options['not_domains'].append(domain[1:])
+                elif domain:
+                    options['domains'].append(domain)
+        elif name in ('important', ''):
+            continue
+        else:
+            return None
+    options['types'] = (options['types'] or ALL_TYPES) & ~options['not_types']
+    del options['not_types']
+    return options
+
+
+def parse(line):
+    # Returns (exception, domain, token, rule) for a network rule, None for anything else
+    line = line.strip()
+    if not line or line.startswith(('!', '[')) or '##' in line or '#@#' in line or '#?#' in line or '#$#' in line:
+        return None
+    exception = line.startswith('@@')
+    line = line.removeprefix('@@')
+
+    options = {}
+    if '$' in line:
+        line, _, text = line.rpartition('$')
+        if any(o.strip().lstrip('~').partition('=')[0].lower() in UNSUPPORTED for o in text.split(',')):
+            return None
+        options = parse_options(text)
+        if options is None:
+            return None
+    if not line or (line.startswith('/') and line.endswith('/') and len(line) > 1):
+        # Raw regex rules are too slow to run against every request
+        return None
+
+    # Urls are matched lowercased, so patterns are too
+    line = line.lower()
+    domain = re.fullmatch(r"\|\|([a-z0-9.-]+)\^", line)
+    if domain:
+        return exception, domain.group(1), None, Rule(**options)
+    if not any(c in line for c in '*^|'):
+        return exception, None, pattern_token(line), Rule(line, plain=True, **options)
+    return exception, None, pattern_token(line), Rule(pattern_to_regex(line), **options)
+
+
+class Filters:
+    def __init__(self):
+        self.block = Matcher()
+        self.allow = Matcher()
+
+    def __len__(self):
+        return len(self.block) + len(self.allow)
+
+    def add(self, line):
+        parsed = parse(line)
+        if parsed is None:
+            return
+        exception, domain, token, rule = parsed
+        matcher = self.allow if exception else self.block
+        if domain:
+            matcher.add_domain(domain, rule)
+        else:
+            matcher.add_pattern(token, rule)
+
+    def blocked(self, url, host, source, kind):
+        url = url.lower()
+        host = host.lower()
+        source = source.lower()
+        third_party = bool(source) and base_domain(host) != base_domain(source)
+        tokens = TOKEN.findall(url)
+        if self.block.match(url, host, tokens, kind, third_party, source) is None:
+            return False
+        # Pages allowed as a whole with $document and requests allowed one by one
+        if source and self.allow.match('', source, (), TYPES['document'], False, source):
+            return False
+        return self.allow.match(url, host, tokens, kind, third_party, source) is None
+
+
+def compile_lists(paths):
+    filters = Filters()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                filters.add(line)
+    return filters
+
+
+def lists(directory):
+    return sorted(glob.glob(os.path.join(directory, '*.txt')))
+
+
+def load(directory, cache_path):
+    # The compiled lists are cached and reused until a list file changes
+    paths = lists(directory)
+    key = (CACHE_VERSION, [(p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths])
+    try:
+        with open(cache_path, 'rb') as f:
+            if pickle.load(f) == key:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        pass
+
+    filters = compile_lists(paths)
+    try:
+        temp = cache_path + '.tmp'
+        with open(temp, 'wb') as f:
+            pickle.dump(key, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(filters, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cache_path)
+    except OSError as e:
+        print(f"Could not cache filter lists: {e}", file=sys.stderr)
+    return filters
+
+
+class Interceptor(QtWebEngineCore.QWebEngineUrlRequestInterceptor):
+    def __init__(self, filters=None, parent=None):
+        super().__init__(parent)
+
+        # Requests pass through until filters are set, so lists can load in the background
+        self.filters = filters
+
+    def interceptRequest(self, info):
+        # Runs on the network thread for every request, top level navigations are never blocked
+        filters = self.filters
+        kind = RESOURCE_TYPES.get(info.resourceType())
+        if filters is None or kind is None:
+            return
+        url = info.requestUrl()
+        if url.scheme() not in ('http', 'https', 'ws', 'wss'):
+            return
+        if filters.blocked(url.toString(), url.host(), info.firstPartyUrl().host(), kind):
+            info.block(True)
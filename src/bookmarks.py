@@ -0,0 +1,318 @@
+import os
+import re
+import csv
+import html
+import time
+import sqlite3
+
+from PySide6 import QtCore, QtWidgets
+
+
+ROOT = 0
+TAG = re.compile(r"<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>|<![^>]*>", re.S)
+ATTRIBUTE = re.compile(r"""([\w-]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)""")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    url TEXT,
+    added REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tags (
+    bookmark_id INTEGER NOT NULL REFERENCES bookmarks(id),
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, bookmark_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bookmarks_parent ON bookmarks(parent, position);
+CREATE INDEX IF NOT EXISTS bookmarks_url ON bookmarks(url);
+CREATE INDEX IF NOT EXISTS tags_bookmark ON tags(bookmark_id);
+"""
+# Rows are (id, title, url, parent, added, tags) with folders having no url and tags comma separated
+BOOKMARK = (
+    "SELECT bookmarks.id, bookmarks.title, bookmarks.url, bookmarks.parent, bookmarks.added, "
+    "(SELECT group_concat(tag, ',') FROM tags WHERE bookmark_id = bookmarks.id) FROM bookmarks"
+)
+
+
+def attributes(text):
+    return {
+        name.lower(): html.unescape(value[1:-1] if value[0] in '"\'' else value)
+        for name, value in ATTRIBUTE.findall(text)
+    }
+
+
+class BookmarkStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.load()
+
+    def load(self):
+        # Every bookmarked url with how many bookmarks point at it, so lookups never touch the database
+        self.urls = {}
+        for (url,) in self.db.execute("SELECT url FROM bookmarks WHERE url IS NOT NULL"):
+            self.urls[url] = self.urls.get(url, 0) + 1
+        self.folders = {row[0]: row[1:] for row in self.db.execute(
+            "SELECT id, parent, title FROM bookmarks WHERE url IS NULL"
+        )}
+        self.positions = {}
+
+    def is_bookmarked(self, url):
+        return url in self.urls
+
+    def position(self, parent):
+        # Next free position in a folder, remembered so bulk inserts don't query for it
+        if parent not in self.positions:
+            self.positions[parent] = self.db.execute(
+                "SELECT COALESCE(MAX(position), -1) FROM bookmarks WHERE parent = ?", (parent,)
+            ).fetchone()[0]
+        self.positions[parent] += 1
+        return self.positions[parent]
+
+    def insert(self, title, url=None, parent=ROOT, tags=(), added=None):
+        bookmark_id = self.db.execute(
+            "INSERT INTO bookmarks (parent, position, title, url, added) VALUES (?, ?, ?, ?, ?)",
+            (parent, self.position(parent), title, url, added or time.time())
+        ).lastrowid
+        if url is None:
+            self.folders[bookmark_id] = (parent, title)
+        else:
+            self.urls[url] = self.urls.get(url, 0) + 1
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tags (bookmark_id, tag) VALUES (?, ?)", [(bookmark_id, t) for t in tags]
+            )
+        return bookmark_id
+
+    def add(self, title, url, parent=ROOT, tags=()):
+        with self.db:
+            return self.get(self.insert(title, url, parent, tags))
+
+    def add_folder(self, title, parent=ROOT):
+        with self.db:
+            return self.insert(title, None, parent)
+
+    def folder(self, path):
+        # Folder id for a "A/B/C" path, created as needed
+        parent = ROOT
+        with self.db:
+            for title in filter(None, (part.strip() for part in path.split('/'))):
+                found = next((i for i, (p, t) in self.folders.items() if p == parent and t == title), None)
+                parent = found if found is not None else self.insert(title, None, parent)
+        return parent
+
+    def folder_path(self, folder):
+        parts = []
+        while folder in self.folders:
+            folder, title = self.folders[folder]
+            parts.append(title)
+        return '/'.join(reversed(parts))
+
+    def get(self, bookmark_id):
+        return self.db.execute(f"{BOOKMARK} WHERE id = ?", (bookmark_id,)).fetchone()
+
+    def children(self, parent=ROOT, limit=-1):
+        return self.db.execute(f"{BOOKMARK} WHERE parent = ? ORDER BY position LIMIT ?", (parent, limit))
+
+    def bookmarks(self):
+        return self.db.execute(f"{BOOKMARK} WHERE url IS NOT NULL ORDER BY parent, position")
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM bookmarks WHERE url IS NOT NULL").fetchone()[0]
+
+    def set_tags(self, bookmark_ids, tags):
+        with self.db:
+            self.db.executemany("DELETE FROM tags WHERE bookmark_id = ?", [(i,) for i in bookmark_ids])
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tags (bookmark_id, tag) VALUES (?, ?)",
+                [(i, t) for i in bookmark_ids for t in tags]
+            )
+
+    def move(self, bookmark_ids, parent):
+        with self.db:
+            for bookmark_id in bookmark_ids:
+                self.db.execute(
+                    "UPDATE bookmarks SET parent = ?, position = ? WHERE id = ?", (parent, self.position(parent), bookmark_id)
+                )
+                if bookmark_id in self.folders:
+                    self.folders[bookmark_id] = (parent, self.folders[bookmark_id][1])
+
+    def remove(self, bookmark_ids):
+        # Folders are removed with everything in them
+        with self.db:
+            for bookmark_id in bookmark_ids:
+                for removed, url in self.db.execute(
+                    "WITH RECURSIVE tree(id) AS (VALUES (?) UNION ALL SELECT bookmarks.id FROM bookmarks JOIN tree ON bookmarks.parent = tree.id) "
+                    "DELETE FROM bookmarks WHERE id IN tree RETURNING id, url", (bookmark_id,)
+                ).fetchall():
+                    self.db.execute("DELETE FROM tags WHERE bookmark_id = ?", (removed,))
+                    self.folders.pop(removed, None)
+                    if url is not None:
+                        self.urls[url] -= 1
+                        if not self.urls[url]:
+                            del self.urls[url]
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM tags")
+            self.db.execute("DELETE FROM bookmarks")
+        self.urls.clear()
+        self.folders.clear()
+        self.positions.clear()
+
+    def import_csv(self, path):
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            with self.db:
+                for row in list(csv.reader(f))[1:]:
+                    if len(row) >= 2:
+                        self.insert(row[0], row[1])
+        os.replace(path, path + '.bak')
+
+    def import_html(self, path, parent=ROOT, chunk=64 * 1024):
+        # Netscape bookmark files are parsed as they are read, in a single transaction
+        parser = NetscapeParser(self, parent)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                with self.db:
+                    while data := f.read(chunk):
+                        parser.feed(data)
+                    parser.close()
+        except Exception:
+            # The rolled back rows are still in the in memory indexes
+            self.load()
+            raise
+        return parser.count
+
+    def export_html(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(
+                "<!DOCTYPE NETSCAPE-Bookmark-file-1>\n"
+                '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+                "<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n"
+            )
+            self.write_folder(f, ROOT, 1)
+            f.write("</DL><p>\n")
+
+    def write_folder(self, f, parent, depth):
+        indent = '    ' * depth
+        for bookmark_id, title, url, _, added, tags in self.children(parent):
+            if url is None:
+                f.write(f'{indent}<DT><H3 ADD_DATE="{int(added)}">{html.escape(title)}</H3>\n{indent}<DL><p>\n')
+                self.write_folder(f, bookmark_id, depth + 1)
+                f.write(f'{indent}</DL><p>\n')
+            else:
+                tags = f' TAGS="{html.escape(tags)}"' if tags else ''
+                f.write(f'{indent}<DT><A HREF="{html.escape(url)}" ADD_DATE="{int(added)}"{tags}>{html.escape(title)}</A>\n')
+
+    def close(self):
+        self.db.close()
+
+
+class NetscapeParser:
+    # Only the tags a bookmark file is made of are looked at, text is kept while inside a heading or link
+    def __init__(self, store, parent):
+        self.store = store
+        self.folders = [parent]
+        self.pending = None
+        self.link = None
+        self.text = None
+        self.rest = ''
+        self.count = 0
+
+    def feed(self, data):
+        data = self.rest + data
+        position = 0
+        for match in TAG.finditer(data):
+            self.handle_data(data[position:match.start()])
+            position = match.end()
+            if match.group(2):
+                tag = match.group(2).lower()
+                if match.group(1):
+                    self.handle_endtag(tag)
+                else:
+                    self.handle_starttag(tag, match.group(3))
+        # A tag cut off at the end of the chunk is finished by the next one
+        cut = data.find('<', position)
+        self.handle_data(data[position:cut if cut >= 0 else len(data)])
+        self.rest = data[cut:] if cut >= 0 else ''
+
+    def close(self):
+        self.handle_data(self.rest)
+        self.rest = ''
+
+    def handle_starttag(self, tag, attrs):
+        match tag:
+            case 'h3' | 'a':
+                self.link = attributes(attrs)
+                self.text = []
+            case 'dl':
+                # The list after a folder heading holds its contents, the first list is the top level
+                self.folders.append(self.pending if self.pending is not None else self.folders[-1])
+                self.pending = None
+
+    def handle_endtag(self, tag):
+        if tag not in ('h3', 'a', 'dl'):
+            return
+        if tag == 'dl':
+            if len(self.folders) > 1:
+                self.folders.pop()
+            return
+        if self.text is None:
+            return
+        title = html.unescape(''.join(self.text)).strip()
+        added = self.link.get('add_date', '')
+        added = int(added) if added.isdigit() else None
+        url = self.link.get('href')
+        if tag == 'h3':
+            self.pending = self.store.insert(title, None, self.folders[-1], added=added)
+        elif url and not url.startswith('javascript:'):
+            tags = [t.strip() for t in self.link.get('tags', '').split(',') if t.strip()]
+            self.store.insert(title or url, url, self.folders[-1], tags, added)
+            self.count += 1
+        self.link = self.text = None
+
+    def handle_data(self, data):
+        if self.text is not None and data:
+            self.text.append(data)
+
+
+class BookmarkMenu(QtCore.QObject):
+    # Puts a folder's bookmarks and subfolders at the top of a menu, each submenu is filled when first opened
+    def __init__(self, menu, store, create_action, parent=ROOT, limit=500):
+        super().__init__(menu)
+
+        self.menu = menu
+        self.store = store
+        self.create_action = create_action
+        self.parent = parent
+        self.limit = limit
+        self.actions = []
+        self.dirty = True
+        menu.aboutToShow.connect(self.populate)
+
+    def invalidate(self):
+        self.dirty = True
+
+    def populate(self):
+        if not self.dirty:
+            return
+        for action in self.actions:
+            self.menu.removeAction(action)
+            # A folder's action belongs to its submenu, which takes the nested menus with it
+            (action.menu() or action).deleteLater()
+        before = self.menu.actions()[0] if self.menu.actions() else None
+        self.actions = []
+        for bookmark_id, title, url, *_ in self.store.children(self.parent, self.limit).fetchall():
+            if url is None:
+                submenu = QtWidgets.QMenu(title, self.menu)
+                BookmarkMenu(submenu, self.store, self.create_action, bookmark_id, self.limit)
+                action = submenu.menuAction()
+            else:
+                action = self.create_action(title, url)
+            self.menu.insertAction(before, action)
+            self.actions.append(action)
+        self.dirty = False
@@ -0,0 +1,1111 @@
+import os
+import sys
+import signal
+import sqlite3
+import subprocess
+
+import pages
+import config
+import stalls
+import webprofile
+import startup
+from PySide6 import (
+    QtCore,
+    QtWidgets,
+    QtWebEngineWidgets,
+    QtWebEngineCore,
+    QtGui
+)
+
+from connectivity import ConnectivityMonitor
+from history import HistoryStore
+from bookmarks import BookmarkStore, BookmarkMenu
+from favicons import FaviconCache
+from pageindex import PageIndex
+from prerender import Prerenderer
+from suggest import Suggester
+from models import ListModel, BookmarksModel, HistoryModel, HistorySearchModel, PageSearchModel, ModelMenu
+from omnibox import FrecencyIndex, Omnibox, load_index
+from lifecycle import TabLifecycle
+from session import Session, LazyTab, history_to_string, string_to_history
+from instance import InstanceServer, server_name
+from downloads import DownloadsModel, byte_to_string
+from updates import UpdateChecker
+from tracing import Tracer
+from tasks import TasksModel, SortRole
+from constants import VERSION, LATEST_VERSION_URL, WEBX, UPGRADE, DATA
+
+startup.mark("imports")
+
+preset = webprofile.prepare()
+app = QtWidgets.QApplication(sys.argv)
+bookmarks_window = history_window = permissions_window = check_updates_window = downloads_window = task_manager_window = None
+windows = []
+
+startup.mark("application")
+
+CONNECTIVITY_PROBE = ("1.1.1.1", 53)
+CONNECTIVITY_INTERVAL = 30000
+HISTORY_PAGE = 200
+BOOKMARK_MENU_LIMIT = 500
+FAVICON_CACHE_SIZE = 256
+PAGE_INDEX_LIMIT = 5000
+PAGE_INDEX_DELAY = 2000
+PRERENDER_THRESHOLD = 0.6
+SUGGEST_DELAY = 150
+SUGGEST_TIMEOUT = 1500
+SUGGEST_CACHE_SIZE = 256
+TAB_FREEZE_AFTER = 300000
+TAB_MEMORY_BUDGET = 2 * 1024 ** 3
+MAX_ACTIVE_DOWNLOADS = 3
+DOWNLOAD_PROGRESS_INTERVAL = 500
+TASK_SAMPLE_INTERVAL = 2000
+UPDATE_CHECK_ON_STARTUP = True
+UPDATE_CHECK_DELAY = 10000
+UPDATE_CHECK_TIMEOUT = 5000
+UPDATE_CACHE_TTL = 6 * 3600
+
+THEME = 'dark' if app.palette().color(QtGui.QPalette.ColorRole.Window).value()<128 else 'light'
+ICONS = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'icons', THEME)
+
+
+def upgrade():
+    subprocess.Popen([UPGRADE])
+    sys.exit()
+
+
+def refresh_permissions():
+    permissions.sync([
+        [p.origin().toString(), p.permissionType().name, p.state().name]
+        for p in profile.listAllPermissions()
+    ])
+
+
+def index_bookmarks(first, last, bookmarked=True):
+    # Rows are removed from the store first, so a url bookmarked twice stays bookmarked
+    for name, url, *_ in bookmarks.rows[first:last + 1]:
+        omnibox_index.bookmark(url, name, bookmarked or bookmark_store.is_bookmarked(url))
+
+
+def forget_urls(urls):
+    # Bookmarked urls still belong in the url bar suggestions
+    for url in urls:
+        if not bookmark_store.is_bookmarked(url):
+            omnibox_index.remove(url)
+
+
+def clear_index():
+    omnibox_index.clear()
+    index_bookmarks(0, len(bookmarks.rows) - 1)
+
+
+def run_command(command):
+    urls = command.get('urls') or []
+    match command.get('cmd'):
+        case 'new_window':
+            window = MainWindow(urls[0] if urls else None)
+            for url in urls[1:]:
+                window.new_tab(url)
+        case 'open_tabs' | 'focus':
+            if not windows:
+                return run_command({'cmd': 'new_window', 'urls': urls})
+            window = windows[-1]
+            for url in urls:
+                window.new_tab(url)
+            if window.isMinimized():
+                window.showNormal()
+            window.show()
+            window.raise_()
+            window.activateWindow()
+
+
+def about():
+    about_window = QtWidgets.QMessageBox()
+    about_window.setWindowTitle("About WebX")
+    about_window.setText('\n'.join([
+        f"WebX Version {VERSION}",
+        "",
+        "© Immortal Coding. All rights reserved.",
+    ]))
+    about_window.setIcon(QtWidgets.QMessageBox.Icon.Information)
+    about_window.setWindowIcon(QtGui.QIcon(WEBX))
+    about_window.exec()
+
+
+def download_file(item):
+    name = item.suggestedFileName()
+    size = item.totalBytes()
+    dialog = QtWidgets.QMessageBox()
+    
+    dialog.setIcon(QtWidgets.QMessageBox.Icon.Question)
+    dialog.setWindowIcon(QtGui.QIcon(WEBX))
+    dialog.setWindowTitle(f"Download File: {name}")
+    dialog.setText(f"What would you like to do with {name} (Size: {byte_to_string(size)})")
+
+    dialog.addButton("Save", QtWidgets.QMessageBox.ButtonRole.AcceptRole)
+    dialog.addButton("Save As", QtWidgets.QMessageBox.ButtonRole.ActionRole)
+    dialog.addButton("Cancel", QtWidgets.QMessageBox.ButtonRole.RejectRole)
+    dialog.exec()
+
+    match dialog.clickedButton().text():
+        case "Save":
+            item.accept()
+            downloads.add(item)
+            show_downloads()
+        case "Save As":
+            folder = QtWidgets.QFileDialog.getExistingDirectory(dialog, "Save To", item.downloadDirectory())
+            if folder:
+                item.setDownloadDirectory(folder)
+                item.accept()
+                downloads.add(item)
+                show_downloads()
+
+
+def all_tabs():
+    for number, window in enumerate(windows, 1):
+        for i in range(window.tabs.count()):
+            tab = window.tabs.widget(i)
+            yield number, window.tabs.tabText(i), tab if isinstance(tab, QtWebEngineWidgets.QWebEngineView) else None
+
+
+def show_task_manager():
+    global task_manager_window
+    if task_manager_window is None:
+        task_manager_window = TaskManagerWindow()
+    task_manager_window.show()
+    task_manager_window.raise_()
+    task_manager_window.activateWindow()
+
+
+def show_downloads():
+    global downloads_window
+    if downloads_window is None:
+        downloads_window = DownloadsWindow()
+    downloads_window.show()
+    downloads_window.raise_()
+    downloads_window.activateWindow()
+
+
+class CheckUpdateWindow(QtWidgets.QWidget):
+    def __init__(self, latest=None):
+        super().__init__()
+
+        self.setWindowTitle("Check Updates")
+        self.setWindowIcon(QtGui.QIcon(WEBX))
+
+        self.root = QtWidgets.QVBoxLayout()
+        self.label = QtWidgets.QLabel("Checking for Updates...")
+        self.upgrade_button = QtWidgets.QPushButton("Upgrade")
+        self.label.setFont(QtGui.QFont(QtGui.QFont().family(), 12, QtGui.QFont.Weight.Medium, False))
+        self.upgrade_button.clicked.connect(upgrade)
+        self.root.addWidget(self.label)
+        self.setLayout(self.root)
+        self.show()
+        if latest is not None:
+            self.show_result(latest)
+        elif connectivity.is_online():
+            updates.checked.connect(self.show_result)
+            updates.check(force=True)
+        else:
+            self.show_result(None)
+
+    def show_result(self, latest):
+        try:
+            updates.checked.disconnect(self.show_result)
+        except (RuntimeError, TypeError):
+            pass
+        if not latest:
+            self.label.setText("No internet!")
+        elif latest == VERSION:
+            self.label.setText("Already Latest Version")
+        else:
+            self.label.setText("You need to upgrade WebX!")
+            self.root.addWidget(self.upgrade_button)
+        self.adjustSize()
+
+    def resizeEvent(self, _): self.adjustSize()
+
+
+def startup_update_check():
+    # Silent check, only surfaces when there is something newer to install
+    def checked(latest):
+        global check_updates_window
+        updates.checked.disconnect(checked)
+        if latest and latest > VERSION and check_updates_window is None:
+            check_updates_window = CheckUpdateWindow(latest)
+    if connectivity.is_online():
+        updates.checked.connect(checked)
+        updates.check()
+
+
+class DownloadsWindow(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowTitle("Downloads")
+        self.setWindowIcon(QtGui.QIcon(WEBX))
+        self.resize(QtCore.QSize(700, 400))
+
+        root = QtWidgets.QVBoxLayout()
+        root.setContentsMargins(0, 0, 0, 0)
+        root.setSpacing(0)
+
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(downloads)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setWordWrap(False)
+        self.table.doubleClicked.connect(lambda index: self.open(index.row()))
+        # Fixed column widths, so progress updates never trigger a relayout
+        self.table.horizontalHeader().setDefaultSectionSize(130)
+        self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeMode.Stretch)
+
+        buttons = QtWidgets.QHBoxLayout()
+        for text, action in (
+            ("Pause", downloads.pause),
+            ("Resume", downloads.resume),
+            ("Cancel", downloads.cancel),
+            ("Remove", downloads.remove_rows),
+        ):
+            button = QtWidgets.QPushButton(text, self)
+            button.clicked.connect(lambda _, action=action: action(self.selected_rows()))
+            buttons.addWidget(button)
+        folder = QtWidgets.QPushButton("Open Folder", self)
+        folder.clicked.connect(self.open_folder)
+        buttons.addWidget(folder)
+        clear = QtWidgets.QPushButton("Clear Finished", self)
+        clear.clicked.connect(downloads.clear)
+        buttons.addWidget(clear)
+
+        root.addWidget(self.table)
+        root.addLayout(buttons)
+        self.setLayout(root)
+
+    def selected_rows(self):
+        return [i.row() for i in self.table.selectionModel().selectedRows()]
+
+    def open(self, row):
+        download = downloads.rows[row]
+        if download.state == 'Finished':
+            QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(download.path()))
+
+    def open_folder(self):
+        rows = self.selected_rows()
+        directory = downloads.rows[rows[0]].directory if rows else profile.downloadPath()
+        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(directory))
+
+
+class TaskManagerWindow(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowTitle("Task Manager")
+        self.setWindowIcon(QtGui.QIcon(WEBX))
+        self.resize(QtCore.QSize(700, 400))
+
+        root = QtWidgets.QVBoxLayout()
+        root.setContentsMargins(0, 0, 0, 0)
+        root.setSpacing(0)
+
+        self.tasks = TasksModel(all_tabs, TASK_SAMPLE_INTERVAL, self)
+        self.model = QtCore.QSortFilterProxyModel(self)
+        self.model.setSourceModel(self.tasks)
+        self.model.setSortRole(SortRole)
+
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setWordWrap(False)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, QtCore.Qt.SortOrder.AscendingOrder)
+        self.table.horizontalHeader().setDefaultSectionSize(100)
+        self.table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+
+        buttons = QtWidgets.QHBoxLayout()
+        reload = QtWidgets.QPushButton("Reload", self)
+        reload.clicked.connect(self.reload)
+        buttons.addWidget(reload)
+        end = QtWidgets.QPushButton("End Process", self)
+        end.clicked.connect(self.end_process)
+        buttons.addWidget(end)
+
+        root.addWidget(self.table)
+        root.addLayout(buttons)
+        self.setLayout(root)
+
+    def selected_rows(self):
+        return [self.model.mapToSource(i).row() for i in self.table.selectionModel().selectedRows()]
+
+    def reload(self):
+        for row in self.selected_rows():
+            if self.tasks.views[row] is not None:
+                self.tasks.views[row].reload()
+
+    def end_process(self):
+        # Every tab sharing the renderer goes down with it and shows its crashed page
+        for pid in {self.tasks.rows[row][2] for row in self.selected_rows()}:
+            if pid:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+
+    def showEvent(self, event):
+        self.tasks.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.tasks.stop()
+        super().hideEvent(event)
+
+
+class TableWindow(QtWidgets.QWidget):
+    def __init__(self, data, from_window):
+        super().__init__()
+
+        self.setFixedSize(QtCore.QSize(600, 400))
+        self.setWindowIcon(QtGui.QIcon(WEBX))
+        self.data = data
+        self.from_window = from_window
+
+        root = QtWidgets.QVBoxLayout()
+        root.setContentsMargins(0, 0, 0, 0)
+        root.setSpacing(0)
+
+        # History is filtered and sorted by sqlite, the in memory models through a proxy
+        if data is history:
+            self.model = HistorySearchModel(history, self)
+        else:
+            self.model = QtCore.QSortFilterProxyModel(self)
+            self.model.setSourceModel(data)
+            self.model.setFilterKeyColumn(-1)
+            self.model.setFilterCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
+
+        self.search = QtWidgets.QLineEdit()
+        self.search.setPlaceholderText("Search")
+        self.search.setClearButtonEnabled(True)
+        self.search.textChanged.connect(lambda: self.search_timer.start())
+        self.search_timer = QtCore.QTimer(self, singleShot=True, interval=150)
+        self.search_timer.timeout.connect(self.filter)
+
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setWordWrap(False)
+        self.table.doubleClicked.connect(self.double_clicked)
+        self.table.horizontalHeader().setSortIndicator(-1, QtCore.Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+
+        add = QtWidgets.QPushButton("Add Bookmark", self)
+        add.clicked.connect(self.add_bookmark)
+
+        remove = QtWidgets.QPushButton("Remove Selected", self)
+        remove.clicked.connect(self.remove_selected)
+
+        clear = QtWidgets.QPushButton("Clear All", self)
+        clear.clicked.connect(self.clear_all)
+
+        tags = QtWidgets.QPushButton("Edit Tags", self)
+        tags.clicked.connect(self.edit_tags)
+
+        move = QtWidgets.QPushButton("Move to Folder", self)
+        move.clicked.connect(self.move_to_folder)
+
+        import_html = QtWidgets.QPushButton("Import", self)
+        import_html.clicked.connect(self.import_bookmarks)
+
+        export_html = QtWidgets.QPushButton("Export", self)
+        export_html.clicked.connect(self.export_bookmarks)
+
+        root.addWidget(self.search)
+        root.addWidget(self.table)
+        root.addWidget(remove)
+
+        if data is bookmarks:
+            self.setWindowTitle("Manage Bookmarks")
+            self.search.setPlaceholderText("Search Name, Url, Folder or Tags")
+            root.addWidget(tags)
+            root.addWidget(move)
+            root.addWidget(add)
+            root.addWidget(import_html)
+            root.addWidget(export_html)
+        elif data is history:
+            self.setWindowTitle("Manage History")
+            self.search.setPlaceholderText("Search Title or Url")
+            page_text = QtWidgets.QCheckBox("Search Page Text", self)
+            page_text.toggled.connect(self.search_page_text)
+            root.insertWidget(1, page_text)
+            root.addWidget(clear)
+        elif data is permissions:
+            self.setWindowTitle("Manage Permission")
+            self.search.setPlaceholderText("Search Origin or Permission")
+            root.addWidget(clear)
+        self.table.horizontalHeader().setMaximumSectionSize(200)
+        self.table.horizontalHeader().setDefaultSectionSize(200)
+        self.table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+
+        self.setLayout(root)
+        self.show()
+
+    def search_page_text(self, checked):
+        # Pages are matched by what was on them through the full text index, best match first
+        self.model.deleteLater()
+        self.model = PageSearchModel(page_index, favicons.icon, parent=self) if checked else HistorySearchModel(history, self)
+        self.search.setPlaceholderText("Search Page Text" if checked else "Search Title or Url")
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(2 if checked else 1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        self.filter()
+
+    def filter(self):
+        if self.data is history:
+            self.model.set_filter(self.search.text())
+        else:
+            self.model.setFilterFixedString(self.search.text())
+
+    def selected_rows(self):
+        rows = [i.row() for i in self.table.selectionModel().selectedRows()]
+        if self.data is history:
+            return rows
+        return [self.model.mapToSource(self.model.index(r, 0)).row() for r in rows]
+
+    def double_clicked(self, index):
+        url = self.model.index(index.row(), 0 if self.data is permissions else 1).data()
+        if url:
+            self.destroy()
+            self.from_window.new_tab(url)
+
+    def add_bookmark(self):
+        name, ok = QtWidgets.QInputDialog.getText(self, "Bookmark Name", "Name:")
+        if not name or not ok:
+            return
+        url, ok = QtWidgets.QInputDialog.getText(self, "Bookmark Link", "Url:")
+        if not url or not ok:
+            return
+        bookmarks.append([name, url])
+
+    def edit_tags(self):
+        rows = self.selected_rows()
+        if not rows:
+            return
+        tags, ok = QtWidgets.QInputDialog.getText(self, "Bookmark Tags", "Tags (comma separated):", text=bookmarks.rows[rows[0]][3])
+        if ok:
+            bookmarks.set_tags(rows, tags)
+
+    def move_to_folder(self):
+        rows = self.selected_rows()
+        if not rows:
+            return
+        folder, ok = QtWidgets.QInputDialog.getText(self, "Move Bookmarks", "Folder (like Work/Docs):", text=bookmarks.rows[rows[0]][2])
+        if ok:
+            bookmarks.move(rows, folder)
+
+    def import_bookmarks(self):
+        path = QtWidgets.QFileDialog.getOpenFileName(self, "Import Bookmarks", os.path.expanduser('~'), "Bookmark Files (*.htm *.html)")[0]
+        if not path:
+            return
+        try:
+            count = bookmarks.import_html(path)
+        except (OSError, sqlite3.Error) as e:
+            QtWidgets.QMessageBox.warning(self, "Import Bookmarks", f"Could not import {path}: {e}")
+            return
+        QtWidgets.QMessageBox.information(self, "Import Bookmarks", f"Imported {count} bookmarks")
+
+    def export_bookmarks(self):
+        path = QtWidgets.QFileDialog.getSaveFileName(self, "Export Bookmarks", os.path.join(os.path.expanduser('~'), 'bookmarks.html'), "Bookmark Files (*.html)")[0]
+        if not path:
+            return
+        try:
+            bookmark_store.export_html(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Export Bookmarks", f"Could not export {path}: {e}")
+
+    def remove_selected(self):
+        rows = self.selected_rows()
+        if not rows:
+            return
+        if self.data is permissions:
+            selected = {tuple(permissions.rows[r][:2]) for r in rows}
+            for p in profile.listAllPermissions():
+                if (p.origin().toString(), p.permissionType().name) in selected:
+                    p.reset()
+            refresh_permissions()
+        elif self.data is history:
+            self.model.remove_rows(rows)
+        else:
+            self.data.remove_rows(rows)
+
+    def clear_all(self):
+        if self.data is permissions:
+            [p.reset() for p in profile.listAllPermissions()]
+            refresh_permissions()
+        else:
+            self.data.clear()
+
+
+class WebEnginePage(QtWebEngineCore.QWebEnginePage):
+    def __init__(self, window, browser):
+        super().__init__(profile, browser)
+
+        self.from_window = window
+        self.permissionRequested.connect(self.permission_requested)
+
+    def createWindow(self, _):
+        page = WebEnginePage(self, self.from_window)
+        page.urlChanged.connect(lambda url: self.from_window.new_tab(url.toString()))
+        return page
+    
+    def permission_requested(self, permission):
+        name = permission.permissionType().name
+        origin = permission.origin().toString()
+        clicked = QtWidgets.QMessageBox.question(
+            self.from_window,
+            f"{name} Requested - {self.title()}",
+            f"Do you want to allow {name} for {origin}?",
+            QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
+        )
+        if clicked == QtWidgets.QMessageBox.StandardButton.Yes:
+            permission.grant()
+        else:
+            permission.deny()
+        refresh_permissions()
+
+
+class PrerenderPage(WebEnginePage):
+    # Loaded before it has a window, so nothing it asks for reaches the user until a tab takes it
+    def __init__(self):
+        super().__init__(None, None)
+
+        self.deferred = []
+
+    def createWindow(self, kind):
+        return super().createWindow(kind) if self.from_window else None
+
+    def permission_requested(self, permission):
+        if self.from_window:
+            super().permission_requested(permission)
+        else:
+            self.deferred.append(permission)
+
+    def attach(self, window):
+        self.from_window = window
+        for permission in self.deferred:
+            self.permission_requested(permission)
+        self.deferred = []
+
+
+class MainWindow(QtWidgets.QMainWindow):
+    def __init__(self, url=None, state=None):
+        super().__init__()
+
+        # Set Window Characteristics
+        self.setMinimumSize(QtCore.QSize(900, 600))
+        self.setWindowIcon(QtGui.QIcon(WEBX))
+        self.setWindowTitle("WebX")
+
+        # Tabs
+        self.restoring = False
+        self.tabs = QtWidgets.QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.currentChanged.connect(self.current_changed)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.tabBarDoubleClicked.connect(lambda: self.showNormal() if self.isMaximized() else self.showMaximized())
+        self.setCentralWidget(self.tabs)
+
+        # New Tab Button
+        self.new_tab_button = QtWidgets.QPushButton()
+        self.new_tab_button.setIcon(QtGui.QIcon(os.path.join(ICONS, 'new_tab.png')))
+        self.new_tab_button.setIconSize(QtCore.QSize(18, 18))
+        self.new_tab_button.setFixedSize(20, 20)
+        self.new_tab_button.pressed.connect(self.new_tab)
+        self.new_tab_button.setShortcut('Ctrl+T')
+        self.tabs.setCornerWidget(self.new_tab_button)
+
+        # Toolbar
+        self.navbar = QtWidgets.QToolBar()
+        self.navbar.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.PreventContextMenu)
+        self.navbar.setMovable(False)
+        self.navbar.setIconSize(QtCore.QSize(20, 20))
+
+        # Back Button
+        back_button = QtGui.QAction(QtGui.QIcon(os.path.join(ICONS, 'back.png')), "Back", self, shortcut='Alt+Left')
+        back_button.triggered.connect(lambda: self.tabs.currentWidget().back())
+
+        # Forward Button
+        forward_button = QtGui.QAction(QtGui.QIcon(os.path.join(ICONS, 'forward.png')), "Forward", self, shortcut='Alt+Right')
+        forward_button.triggered.connect(lambda: self.tabs.currentWidget().forward())
+
+        # Reload Button
+        reload_button = QtGui.QAction(QtGui.QIcon(os.path.join(ICONS, 'reload.png')), "Reload", self, shortcut='Ctrl+R')
+        reload_button.triggered.connect(lambda: self.tabs.currentWidget().reload())
+
+        # Address Bar
+        self.url_bar = QtWidgets.QLineEdit()
+        self.url_bar.setPlaceholderText("Type a url or Search")
+        self.url_bar.returnPressed.connect(self.navigate_to_url)
+        self.url_bar.mouseDoubleClickEvent = lambda e: self.url_bar.selectAll()
+        self.omnibox = Omnibox(self.url_bar, omnibox_index, text_search=page_index.search_later, suggester=suggester)
+        if preset['prerender']:
+            self.omnibox.suggested.connect(prerenderer.predict)
+
+        # Add buttons to toolbar
+        self.navbar.addAction(back_button)
+        self.navbar.addAction(forward_button)
+        self.navbar.addAction(reload_button)
+        self.navbar.addSeparator()
+        self.navbar.addWidget(self.url_bar)
+
+        # Keyboard Shortcuts
+        close_tab = QtGui.QShortcut('Ctrl+W', self)
+        close_tab.activated.connect(self.close_tab)
+        focus_url_bar = QtGui.QShortcut('Ctrl+L', self)
+        focus_url_bar.activated.connect(lambda: self.url_bar.setFocus())
+
+        # Menu Bar
+        self.menubar = self.menuBar()
+        self.menubar.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.PreventContextMenu)
+
+        # Add menus to menu bar
+        self.file_menu = self.menubar.addMenu('&File')
+        self.bookmarks_menu = self.menubar.addMenu('&Bookmarks')
+        self.history_menu = self.menubar.addMenu('&History')
+        self.help_menu = self.menubar.addMenu('&Help')
+
+        # Open File
+        open_file = QtGui.QAction("&Open File", self)
+        open_file.setShortcut('Ctrl+O')
+        open_file.triggered.connect(self.open_file)
+
+        # New Window
+        new = QtGui.QAction('&New Window', self, shortcut='Ctrl+N')
+        new.triggered.connect(MainWindow)
+
+        # Downloads
+        show_downloads_action = QtGui.QAction('&Downloads', self, shortcut='Ctrl+J')
+        show_downloads_action.triggered.connect(show_downloads)
+
+        # Task Manager
+        task_manager = QtGui.QAction('&Task Manager', self, shortcut='Shift+Esc')
+        task_manager.triggered.connect(show_task_manager)
+
+        # Exit App
+        exit_app = QtGui.QAction('&Exit', self, shortcut='Ctrl+Shift+W')
+        exit_app.triggered.connect(self.close)
+
+        # Manage Permissions
+        manage_permissions = QtGui.QAction('&Manage Permissions', self)
+        manage_permissions.triggered.connect(lambda: self.table_window(permissions))
+
+        # Cookies
+        remove_cookies = QtGui.QAction('&Clear Cookies', self)
+        remove_cookies.triggered.connect(lambda: profile.cookieStore().deleteAllCookies())
+
+        # Check for updates
+        check_updates = QtGui.QAction('&Check for Updates', self)
+        check_updates.setShortcut('Ctrl+Shift+U')
+        check_updates.triggered.connect(self.check_updates)
+
+        # About App
+        about_app = QtGui.QAction('&About WebX', self)
+        about_app.setShortcut('F1')
+        about_app.triggered.connect(about)
+
+        # Add actions to file menu
+        self.file_menu.addAction(open_file)
+        self.file_menu.addAction(new)
+        self.file_menu.addAction(show_downloads_action)
+        self.file_menu.addAction(task_manager)
+        self.file_menu.addSeparator()
+        self.file_menu.addAction(exit_app)
+
+        # Add actions to help menu
+        self.help_menu.addAction(manage_permissions)
+        self.help_menu.addAction(remove_cookies)
+        self.help_menu.addSeparator()
+        self.help_menu.addAction(check_updates)
+        self.help_menu.addAction(about_app)
+
+        # Add actions to bookmarks and history menu
+        bookmark_menu = BookmarkMenu(self.bookmarks_menu, bookmark_store, self.url_action, limit=BOOKMARK_MENU_LIMIT)
+        for changed in (bookmarks.rowsInserted, bookmarks.rowsRemoved, bookmarks.dataChanged, bookmarks.modelReset):
+            changed.connect(bookmark_menu.invalidate)
+        ModelMenu(self.history_menu, history, lambda r: self.menu_action(history, r), limit=10)
+        add_current = QtGui.QAction("Bookmark Current Site", self, shortcut="Ctrl+D")
+        add_current.triggered.connect(self.bookmark_current)
+        manage_bookmarks = QtGui.QAction("Manage Bookmarks", self)
+        manage_bookmarks.triggered.connect(lambda: self.table_window(bookmarks))
+        manage_history = QtGui.QAction("Manage History", self)
+        manage_history.triggered.connect(lambda: self.table_window(history))
+        self.bookmarks_menu.addSeparator()
+        self.bookmarks_menu.addAction(add_current)
+        self.bookmarks_menu.addAction(manage_bookmarks)
+        self.history_menu.addSeparator()
+        self.history_menu.addAction(manage_history)
+
+        # Finalizing window
+        self.addToolBar(self.navbar)
+        windows.append(self)
+        if state:
+            self.restore(state)
+        else:
+            self.new_tab(url)
+        self.show()
+        self.activateWindow()
+
+    def new_tab(self, url=None, state=None):
+        # Restored tabs start as placeholders and only get a browser when first shown
+        if state:
+            tab = LazyTab(state, favicons.icon(state['url']))
+            self.tabs.addTab(tab, tab.icon, state.get('title') or state['url'])
+            return
+
+        if url:
+            qurl = pages.resolve(QtCore.QUrl(url))
+            qurl.setScheme(qurl.scheme() or 'http')
+        else:
+            qurl = QtCore.QUrl(pages.HOME)
+
+        browser = self.create_browser()
+        idx = self.tabs.addTab(browser, favicons.icon(qurl.toString()), url or "WebX Homepage")
+        self.tabs.setCurrentIndex(idx)
+        browser.setUrl(qurl)
+        session.changed()
+
+    def create_browser(self):
+        browser = QtWebEngineWidgets.QWebEngineView()
+        browser.setPage(WebEnginePage(self, browser))
+        browser.urlChanged.connect(lambda qurl, b=browser: self.update_url_bar(qurl, b))
+        browser.urlChanged.connect(session.changed)
+        browser.loadFinished.connect(lambda _, b=browser: self.load_finished(b))
+        self.connect_page(browser)
+        tracer.watch(browser)
+
+        return browser
+
+    def connect_page(self, browser):
+        browser.page().fullScreenRequested.connect(self.handle_fullscreen)
+        browser.page().iconChanged.connect(lambda icon, b=browser: self.icon_changed(icon, b))
+        browser.page().renderProcessTerminated.connect(lambda status, _, b=browser: self.render_process_terminated(b, status))
+
+    def render_process_terminated(self, browser, status):
+        # A dead renderer leaves a blank view, show what happened with a way back to the page
+        if status == QtWebEngineCore.QWebEnginePage.RenderProcessTerminationStatus.NormalTerminationStatus:
+            return
+        url = browser.url()
+        if url.scheme() == 'webx' and pages.host(url) == 'crashed':
+            return
+        encoded = bytes(QtCore.QUrl.toPercentEncoding(url.toString())).decode()
+        browser.setUrl(QtCore.QUrl(f"webx://crashed?url={encoded}"))
+
+    def restore(self, state):
+        self.restoring = True
+        for tab in state['tabs']:
+            self.new_tab(state=tab)
+        self.restoring = False
+        if state.get('geometry'):
+            self.restoreGeometry(QtCore.QByteArray.fromBase64(state['geometry'].encode()))
+        self.tabs.setCurrentIndex(min(state.get('current', 0), self.tabs.count() - 1))
+        self.current_changed()
+
+    def materialize(self, i):
+        placeholder = self.tabs.widget(i)
+        state = placeholder.state
+        browser = self.create_browser()
+        self.tabs.blockSignals(True)
+        self.tabs.insertTab(i, browser, placeholder.icon, self.tabs.tabText(i))
+        self.tabs.removeTab(i + 1)
+        self.tabs.setCurrentIndex(i)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+        if not (state.get('history') and string_to_history(state['history'], browser.history())):
+            browser.setUrl(QtCore.QUrl(state['url']))
+        if state.get('scroll'):
+            browser.loadFinished.connect(
+                lambda _, b=browser: b.page().runJavaScript("window.scrollTo({}, {})".format(*state['scroll'])),
+                QtCore.Qt.ConnectionType.SingleShotConnection
+            )
+        return browser
+
+    def state(self):
+        tabs = []
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if isinstance(tab, LazyTab):
+                tabs.append(tab.state)
+                continue
+            scroll = tab.page().scrollPosition()
+            tabs.append({
+                'url': tab.url().toString(),
+                'title': self.tabs.tabText(i),
+                'scroll': [scroll.x(), scroll.y()],
+                'history': history_to_string(tab.history()),
+            })
+        return {
+            'tabs': tabs,
+            'current': self.tabs.currentIndex(),
+            'geometry': bytes(self.saveGeometry().toBase64()).decode(),
+        }
+
+    def current_changed(self):
+        if self.restoring:
+            return
+        browser = self.tabs.currentWidget()
+        if isinstance(browser, LazyTab):
+            browser = self.materialize(self.tabs.currentIndex())
+        lifecycle.activate(browser)
+        self.update_url_bar(browser.url(), browser)
+        session.changed()
+
+    def icon_changed(self, icon, browser):
+        # Until a page has its own icon, and while it is discarded, the one last seen for it is shown
+        url = browser.url().toString()
+        if icon.isNull():
+            icon = favicons.icon(url)
+        else:
+            favicons.store(url, icon)
+        self.tabs.setTabIcon(self.tabs.indexOf(browser), icon)
+
+    def close_tab(self, i=None):
+        if self.tabs.count() == 1:
+            self.tabs.currentWidget().setUrl(QtCore.QUrl(pages.HOME))
+        else:
+            tab = self.tabs.widget(i if i is not None else self.tabs.currentIndex())
+            self.tabs.removeTab(self.tabs.indexOf(tab))
+            tab.deleteLater()
+            session.changed()
+
+    def navigate_to_url(self):
+        url = self.url_bar.text()
+        self.tabs.setTabText(self.tabs.currentIndex(), url)
+
+        # Check if user is trying to search
+        if ' ' in url or not any(i in url for i in ['.', ':']):
+            url = config.query_url(search_engine['search'], url)
+
+        qurl = pages.resolve(QtCore.QUrl(url))
+        if not qurl.scheme():
+            qurl.setScheme('http')
+
+        # Swap in the page loaded while typing if it was going to the same place
+        browser = self.tabs.currentWidget()
+        prerendered = prerenderer.take(qurl.toString())
+        if prerendered:
+            self.swap_page(browser, *prerendered)
+        else:
+            browser.setUrl(qurl)
+        self.update_url_bar(browser.url() if prerendered else qurl, browser)
+
+    def swap_page(self, browser, page, loaded):
+        old = browser.page()
+        page.setParent(browser)
+        browser.setPage(page)
+        old.deleteLater()
+        self.connect_page(browser)
+        self.icon_changed(page.icon(), browser)
+        # A page that already finished never tells the view, so it is recorded here
+        if loaded:
+            self.load_finished(browser)
+        page.attach(self)
+
+    def update_url_bar(self, qurl, browser):
+        if browser != self.tabs.currentWidget():
+            return
+        self.url_bar.setText(pages.display(qurl))
+
+    def load_finished(self, browser):
+        startup.mark("first loadFinished", once=True)
+        qurl = browser.url()
+        title = browser.page().title()
+
+        # Set tab Text
+        self.tabs.setTabText(self.tabs.indexOf(browser), title)
+        session.changed()
+
+        # Add to history
+        if pages.is_builtin(qurl) or not connectivity.is_online():
+            return
+        history.add(title, qurl.toString())
+
+        # Page text is read once the page has settled, and indexed on page_index's own thread
+        if page_index.wants(qurl.toString()):
+            QtCore.QTimer.singleShot(PAGE_INDEX_DELAY, browser, lambda b=browser, u=qurl.toString(): self.index_page(b, u))
+
+    def index_page(self, browser, url):
+        if browser.url().toString() == url:
+            title = browser.page().title()
+            browser.page().toPlainText(lambda text: page_index.add(url, title, text))
+
+    def open_file(self):
+        ext_filter = "HTML Files (*.htm *.html *.xhtml) ;; PDF Files (*.pdf) ;; All Files (*)"
+        filepath = QtWidgets.QFileDialog.getOpenFileUrl(self, "Open File", os.path.expanduser('~'), ext_filter)[0].toString()
+        if filepath:
+            self.new_tab(filepath)
+
+    def bookmark_current(self):
+        url = self.tabs.currentWidget().url().toString()
+        if bookmark_store.is_bookmarked(url):
+            answer = QtWidgets.QMessageBox.question(self, "Bookmark Current Site", "This site is already bookmarked, remove it?")
+            if answer == QtWidgets.QMessageBox.StandardButton.Yes:
+                bookmarks.remove_rows([r for r, row in enumerate(bookmarks.rows) if row[1] == url])
+            return
+        name, ok = QtWidgets.QInputDialog.getText(self, "Bookmark Name", "Name:", text=self.tabs.tabText(self.tabs.currentIndex()))
+        if name and ok:
+            bookmarks.append([name, url])
+
+    def url_action(self, title, url):
+        action = QtGui.QAction(favicons.icon(url), title, self)
+        action.triggered.connect(lambda _, u=url: self.new_tab(u))
+        return action
+
+    def menu_action(self, model, row):
+        return self.url_action(model.index(row, 0).data(), model.index(row, 1).data())
+
+    def table_window(self, data):
+        global bookmarks_window, history_window, permissions_window
+        if data is bookmarks:
+            bookmarks_window = TableWindow(bookmarks, self)
+        elif data is history:
+            history_window = TableWindow(history, self)
+        elif data is permissions:
+            permissions_window = TableWindow(permissions, self)
+
+    def check_updates(self):
+        global check_updates_window
+        check_updates_window = CheckUpdateWindow()
+
+    def paintEvent(self, event):
+        startup.mark("first paint", once=True)
+        super().paintEvent(event)
+
+    def closeEvent(self, event):
+        # The last window stays in the session so it is restored on the next launch
+        if len(windows) > 1:
+            windows.remove(self)
+        session.save()
+        event.accept()
+
+    def handle_fullscreen(self, request):
+        request.accept()
+        maximized = True if self.isMaximized() else False
+        if request.toggleOn():
+            self.showFullScreen()
+            self.menubar.hide()
+            self.navbar.hide()
+            self.tabs.tabBar().hide()
+        else:
+            self.menubar.show()
+            self.navbar.show()
+            self.tabs.tabBar().show()
+            self.showMaximized() if maximized else self.showNormal()
+
+
+# Take commands from later launches
+instance = InstanceServer(server_name(DATA))
+instance.command.connect(run_command)
+
+# Watch internet connection in the background
+connectivity = ConnectivityMonitor(*CONNECTIVITY_PROBE, interval=CONNECTIVITY_INTERVAL)
+connectivity.start()
+
+# Check for new versions without blocking the interface
+updates = UpdateChecker(LATEST_VERSION_URL, os.path.join(DATA, 'update.json'), ttl=UPDATE_CACHE_TTL, timeout=UPDATE_CHECK_TIMEOUT)
+
+# Freeze and discard background tabs
+lifecycle = TabLifecycle(
+    lambda: [
+        w.tabs.widget(i) for w in QtWidgets.QApplication.topLevelWidgets()
+        if isinstance(w, MainWindow) for i in range(w.tabs.count())
+        if isinstance(w.tabs.widget(i), QtWebEngineWidgets.QWebEngineView)
+    ],
+    freeze_after=TAB_FREEZE_AFTER,
+    memory_budget=TAB_MEMORY_BUDGET
+)
+
+# Initialize Browser Profile
+profile, page_handler = webprofile.create_profile(preset)
+profile.downloadRequested.connect(download_file)
+
+# Record how long each navigation takes, shown on webx://performance
+tracer = Tracer(os.path.join(DATA, 'trace.jsonl'), {'version': VERSION, 'preset': preset['name']})
+page_handler.generators['performance.html'] = tracer.report
+
+# Searches and query suggestions from the search engine in config.json
+search_engine = config.search_engine(os.path.join(DATA, 'config.json'))
+suggester = Suggester(search_engine['suggest'], SUGGEST_DELAY, SUGGEST_TIMEOUT, SUGGEST_CACHE_SIZE) if search_engine['suggest'] else None
+
+# Load the likeliest url bar destination while it is still being typed
+prerenderer = Prerenderer(PrerenderPage, PRERENDER_THRESHOLD)
+tracer.sections.append(prerenderer.report)
+
+# Watch for a frozen interface when asked to on the command line
+if config.stall_threshold:
+    stall_detector = stalls.StallDetector(os.path.join(DATA, 'stalls.jsonl'), config.stall_threshold)
+    stall_detector.start()
+    tracer.sections.append(stall_detector.report)
+startup.mark("profile")
+
+# Initialize Variables
+favicons = FaviconCache(os.path.join(DATA, 'favicons.db'), FAVICON_CACHE_SIZE)
+bookmark_store = BookmarkStore(os.path.join(DATA, 'bookmarks.db'))
+if os.path.exists(os.path.join(DATA, 'bookmarks.csv')):
+    bookmark_store.import_csv(os.path.join(DATA, 'bookmarks.csv'))
+bookmarks = BookmarksModel(bookmark_store, favicons.icon)
+history_store = HistoryStore(os.path.join(DATA, 'history.db'))
+if os.path.exists(os.path.join(DATA, 'history.csv')):
+    history_store.import_csv(os.path.join(DATA, 'history.csv'))
+history = HistoryModel(history_store, HISTORY_PAGE, favicons.icon)
+page_index = PageIndex(os.path.join(DATA, 'pages.db'), PAGE_INDEX_LIMIT)
+history.modelReset.connect(page_index.clear)
+history.forgotten.connect(page_index.forget)
+omnibox_index = FrecencyIndex()
+load_index(omnibox_index, history_store.frecency())
+index_bookmarks(0, len(bookmarks.rows) - 1)
+history.visited.connect(lambda visit: omnibox_index.visit(visit[2], visit[1], visit[3]))
+history.forgotten.connect(forget_urls)
+history.modelReset.connect(clear_index)
+bookmarks.rowsInserted.connect(lambda _, first, last: index_bookmarks(first, last))
+bookmarks.rowsAboutToBeRemoved.connect(lambda _, first, last: index_bookmarks(first, last, False))
+bookmarks.modelAboutToBeReset.connect(lambda: index_bookmarks(0, len(bookmarks.rows) - 1, False))
+bookmarks.modelReset.connect(lambda: index_bookmarks(0, len(bookmarks.rows) - 1))
+downloads = DownloadsModel(os.path.join(DATA, 'downloads.json'), MAX_ACTIVE_DOWNLOADS, DOWNLOAD_PROGRESS_INTERVAL)
+permissions = ListModel(["Origin", "Permission", "State"], [
+    [p.origin().toString(), p.permissionType().name, p.state().name]
+    for p in profile.listAllPermissions()
+])
+startup.mark("data")
+
+# Save open windows and tabs as they change
+session = Session(os.path.join(DATA, 'session.json'), lambda: {'windows': [w.state() for w in windows]})
+app.aboutToQuit.connect(session.save)
+
+app.setApplicationName("WebX")
+app.setWindowIcon(QtGui.QIcon(os.path.join(ICONS, 'WebX.png')))
+
+
+def run(command):
+    for state in (session.load() or {}).get('windows', []):
+        if state.get('tabs'):
+            MainWindow(state=state)
+    run_command({'cmd': 'open_tabs', 'urls': command['urls']} if windows else command)
+    startup.mark("first window")
+    if UPDATE_CHECK_ON_STARTUP:
+        QtCore.QTimer.singleShot(UPDATE_CHECK_DELAY, startup_update_check)
+    app.exec()
+
+    instance.close()
+    history_store.close()
+    bookmark_store.close()
+    favicons.close()
+    page_index.close()
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import urllib.parse
+
+
+# Settings are QWebEngineSettings.WebAttribute names, cache sizes are in MB with 0 letting chromium decide
+PRESETS = {
+    'default': {
+        'http_cache': 'disk',
+        'http_cache_size': 0,
+        'process_model': 'process-per-site-instance',
+        'renderer_process_limit': None,
+        'flags': ['--disable-gpu'],
+        'prerender': True,
+        'settings': {
+            'PlaybackRequiresUserGesture': True,
+            'PluginsEnabled': True,
+            'ScreenCaptureEnabled': True,
+            'FullScreenSupportEnabled': True,
+            'ScrollAnimatorEnabled': True,
+            'HyperlinkAuditingEnabled': True,
+            'FocusOnNavigationEnabled': True,
+            'JavascriptCanAccessClipboard': True,
+            'JavascriptCanPaste': True,
+            'DnsPrefetchEnabled': True,
+            'BackForwardCacheEnabled': True,
+        },
+    },
+    'low-memory': {
+        'http_cache': 'disk',
+        'http_cache_size': 64,
+        'process_model': 'process-per-site',
+        'renderer_process_limit': 4,
+        'flags': ['--disable-gpu', '--enable-low-end-device-mode'],
+        'prerender': False,
+        'settings': {
+            'ScrollAnimatorEnabled': False,
+            'DnsPrefetchEnabled': False,
+            'BackForwardCacheEnabled': False,
+        },
+    },
+    'throughput': {
+        'http_cache': 'disk',
+        'http_cache_size': 1024,
+        'process_model': 'process-per-site-instance',
+        'renderer_process_limit': None,
+        'flags': ['--disable-gpu'],
+        'prerender': True,
+        'settings': {
+            'DnsPrefetchEnabled': True,
+            'BackForwardCacheEnabled': True,
+        },
+    },
+}
+PROCESS_MODELS = {
+    'process-per-site-instance': [],
+    'process-per-site': ['--process-per-site'],
+    'single-process': ['--single-process'],
+}
+
+# Urls take the url encoded query in place of {}, suggestions answer in the OpenSearch json format
+SEARCH_ENGINES = {
+    'duckduckgo': {
+        'search': 'https://duckduckgo.com/?q={}',
+        'suggest': 'https://duckduckgo.com/ac/?q={}&type=list',
+    },
+    'google': {
+        'search': 'https://www.google.com/search?q={}',
+        'suggest': 'https://suggestqueries.google.com/complete/search?client=firefox&q={}',
+    },
+    'bing': {
+        'search': 'https://www.bing.com/search?q={}',
+        'suggest': 'https://api.bing.com/osjson.aspx?query={}',
+    },
+}
+
+# Set from the command line before the browser is loaded, stall_threshold is in milliseconds and None
+# leaves stall detection off
+preset = None
+stall_threshold = None
+
+
+def read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Only the choices are written, so changes to the built in presets reach everyone who did not override them
+        config = {'preset': 'default', 'search': 'duckduckgo'}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4)
+        return config
+    except (OSError, ValueError) as e:
+        print(f"Ignoring {path}: {e}", file=sys.stderr)
+        return {}
+
+
+def presets(path):
+    # Presets from the config file override the built in ones key by key
+    config = read(path)
+    merged = {}
+    for name in PRESETS.keys() | config.get('presets', {}).keys():
+        base = PRESETS.get(name, PRESETS['default'])
+        custom = config.get('presets', {}).get(name, {})
+        merged[name] = base | custom | {'settings': PRESETS['default']['settings'] | base['settings'] | custom.get('settings', {})}
+    return config.get('preset', 'default'), merged
+
+
+def load(path):
+    default, merged = presets(path)
+    name = preset or default
+    if name not in merged:
+        print(f"Unknown preset {name}, using default", file=sys.stderr)
+        name = 'default'
+    return merged[name] | {'name': name}
+
+
+def search_engine(path):
+    # Engines from the config file are added to the built in ones, one without suggest gets none
+    config = read(path)
+    engines = SEARCH_ENGINES | config.get('search_engines', {})
+    name = config.get('search', 'duckduckgo')
+    if name not in engines or 'search' not in engines[name]:
+        print(f"Unknown search engine {name}, using duckduckgo", file=sys.stderr)
+        name = 'duckduckgo'
+    return {'suggest': None} | engines[name] | {'name': name}
+
+
+def query_url(template, query):
+    return template.replace('{}', urllib.parse.quote(query, safe=''))
+
+
+def chromium_flags(config):
+    flags = list(config['flags']) + PROCESS_MODELS.get(config['process_model'], [])
+    if config['renderer_process_limit']:
+        flags.append(f"--renderer-process-limit={config['renderer_process_limit']}")
+    # Flags already in the environment are kept so one off experiments still work
+    return ' '.join(filter(None, [os.environ.get('QTWEBENGINE_CHROMIUM_FLAGS')] + flags))
@@ -0,0 +1,65 @@
+import time
+
+from PySide6 import QtCore, QtNetwork
+
+
+class ConnectivityMonitor(QtCore.QObject):
+    changed = QtCore.Signal(bool)
+
+    def __init__(self, host="1.1.1.1", port=53, interval=30000, timeout=3000, ttl=None, parent=None):
+        super().__init__(parent)
+
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.ttl = (ttl if ttl is not None else interval) / 1000
+        self.online = True
+        self.checked_at = None
+        self.socket = None
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.probe)
+
+        self.deadline = QtCore.QTimer(self)
+        self.deadline.setSingleShot(True)
+        self.deadline.timeout.connect(lambda: self.finish(False, self.socket))
+
+    def start(self):
+        self.timer.start()
+        self.probe()
+
+    def stop(self):
+        self.timer.stop()
+        self.deadline.stop()
+        if self.socket:
+            self.socket.abort()
+            self.socket.deleteLater()
+            self.socket = None
+
+    def is_online(self):
+        # Never blocks, a stale value only schedules a new probe
+        if self.checked_at is None or time.monotonic() - self.checked_at > self.ttl:
+            self.probe()
+        return self.online
+
+    def probe(self):
+        if self.socket:
+            return
+        socket = self.socket = QtNetwork.QTcpSocket(self)
+        socket.connected.connect(lambda: self.finish(True, socket))
+        socket.errorOccurred.connect(lambda _: self.finish(False, socket))
+        self.deadline.start(self.timeout)
+        socket.connectToHost(self.host, self.port)
+
+    def finish(self, online, socket):
+        if socket is None or socket is not self.socket:
+            return
+        self.socket = None
+        self.deadline.stop()
+        socket.abort()
+        socket.deleteLater()
+        self.checked_at = time.monotonic()
+        if online != self.online:
+            self.online = online
+            self.changed.emit(online)
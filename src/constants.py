@@ -0,0 +1,16 @@
+import os
+
+
+VERSION = 0.1
+LATEST_VERSION_URL = os.getenv("WEBX_VERSION_URL", "https://raw.githubusercontent.com/not-immortalcoding/webx/refs/heads/main/latest_version.txt")
+
+ROOT = os.path.dirname(os.path.realpath(__file__))
+WEBX = os.path.join(ROOT, 'icons', 'WebX.png')
+HTML = os.path.join(ROOT, 'html')
+UPGRADE = os.path.join(ROOT, 'upgrade.exe')
+if '__compiled__' in globals():
+    DATA = os.path.join(os.getenv('AppData'), 'WebX')
+else:
+    DATA = os.path.join(ROOT, 'data')
+# Benchmarks and experiments can point at their own data
+DATA = os.getenv('WEBX_DATA', DATA)
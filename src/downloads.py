@@ -0,0 +1,200 @@
+import os
+import json
+import time
+
+from PySide6 import QtCore, QtWebEngineCore
+
+from models import ListModel
+
+
+State = QtWebEngineCore.QWebEngineDownloadRequest.DownloadState
+FINISHED = {State.DownloadCompleted: 'Finished', State.DownloadCancelled: 'Cancelled', State.DownloadInterrupted: 'Failed'}
+
+
+def byte_to_string(byte):
+    match byte:
+        case 0:
+            return "?"
+        case b if b < 1024:
+            return f"{b} B"
+        case b if b < 1024 ** 2:
+            return f"{b / 1024:.2f} KB"
+        case b if b < 1024 ** 3:
+            return f"{b / (1024 ** 2):.2f} MB"
+        case b:
+            return f"{b / (1024 ** 3):.2f} GB"
+
+
+def seconds_to_string(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds // 60 % 60}m"
+
+
+class Download:
+    __slots__ = ('item', 'name', 'directory', 'total', 'received', 'state', 'speed', 'sampled', 'finished')
+
+    def __init__(self, name, directory, total=0, received=0, state='Downloading', finished=None, item=None):
+        self.item = item
+        self.name = name
+        self.directory = directory
+        self.total = total
+        self.received = received
+        self.state = state
+        self.speed = 0
+        self.sampled = (time.monotonic(), received)
+        self.finished = finished
+
+    def path(self):
+        return os.path.join(self.directory, self.name)
+
+    def record(self):
+        return {
+            'name': self.name, 'directory': self.directory, 'total': self.total,
+            'received': self.received, 'state': self.state, 'finished': self.finished
+        }
+
+
+class DownloadsModel(ListModel):
+    # Rows are Download objects, newest first
+    def __init__(self, path, max_active=3, interval=500, limit=500, parent=None):
+        super().__init__(["Name", "Progress", "Speed", "Remaining", "State"], parent=parent)
+
+        self.path = path
+        self.max_active = max_active
+        self.limit = limit
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.rows = [Download(**record) for record in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            self.rows = []
+
+        # Progress is sampled at a fixed rate instead of on every receivedBytesChanged
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        download = self.rows[index.row()]
+        active = download.state == 'Downloading'
+        match index.column():
+            case 0:
+                return download.name
+            case 1:
+                if download.total > 0:
+                    return f"{byte_to_string(download.received)} / {byte_to_string(download.total)} ({download.received * 100 // download.total}%)"
+                return byte_to_string(download.received)
+            case 2:
+                return f"{byte_to_string(int(download.speed))}/s" if active and download.speed else ""
+            case 3:
+                if active and download.speed and download.total > 0:
+                    return seconds_to_string((download.total - download.received) / download.speed)
+                return ""
+            case 4:
+                return download.state
+
+    def active(self):
+        return sum(d.state == 'Downloading' for d in self.rows)
+
+    def add(self, item):
+        # item has already been accepted, it waits paused when every slot is taken
+        download = Download(item.downloadFileName(), item.downloadDirectory(), item.totalBytes(), item=item)
+        item.isFinishedChanged.connect(lambda: self.finished(download))
+        if self.active() >= self.max_active:
+            item.pause()
+            download.state = 'Queued'
+        self.insert(0, download)
+        self.timer.start()
+
+    def tick(self):
+        now = time.monotonic()
+        last = -1
+        for row, download in enumerate(self.rows):
+            if download.state != 'Downloading':
+                continue
+            received = download.item.receivedBytes()
+            then, before = download.sampled
+            if now > then:
+                speed = (received - before) / (now - then)
+                download.speed = speed if not download.speed else 0.7 * download.speed + 0.3 * speed
+            download.sampled = (now, received)
+            download.received = received
+            download.total = download.item.totalBytes()
+            last = row
+        if last < 0:
+            self.timer.stop()
+            return
+        self.dataChanged.emit(self.index(0, 1), self.index(last, 3))
+
+    def changed(self, download):
+        row = self.rows.index(download)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+    def finished(self, download):
+        item = download.item
+        download.item = None
+        download.state = FINISHED.get(item.state(), 'Failed')
+        download.received = item.receivedBytes()
+        download.total = item.totalBytes()
+        download.finished = time.time()
+        self.changed(download)
+        self.save()
+        self.start_next()
+
+    def start_next(self):
+        # Oldest queued downloads get the free slots first
+        for download in reversed(self.rows):
+            if self.active() >= self.max_active:
+                break
+            if download.state == 'Queued':
+                self.start(download)
+
+    def start(self, download):
+        download.state = 'Downloading'
+        download.speed = 0
+        download.sampled = (time.monotonic(), download.item.receivedBytes())
+        download.item.resume()
+        self.changed(download)
+        self.timer.start()
+
+    def pause(self, rows):
+        for row in rows:
+            download = self.rows[row]
+            if download.state in ('Downloading', 'Queued'):
+                download.item.pause()
+                download.state = 'Paused'
+                self.changed(download)
+        self.start_next()
+
+    def resume(self, rows):
+        for row in rows:
+            download = self.rows[row]
+            if download.state == 'Paused':
+                download.state = 'Queued'
+                self.changed(download)
+        self.start_next()
+
+    def cancel(self, rows):
+        for download in [self.rows[row] for row in rows]:
+            if download.item:
+                download.item.cancel()
+
+    def remove_rows(self, rows):
+        # Only downloads that are over can be removed from the list
+        super().remove_rows([r for r in rows if self.rows[r].item is None])
+        self.save()
+
+    def clear(self):
+        self.remove_rows(range(len(self.rows)))
+
+    def save(self):
+        records = [d.record() for d in self.rows if d.item is None][:self.limit]
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        os.replace(temp, self.path)
@@ -0,0 +1,112 @@
+import time
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+from PySide6 import QtCore, QtGui
+
+
+SIZE = 32
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS icons (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    icon_id INTEGER NOT NULL REFERENCES icons(id),
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pages_updated ON pages(updated);
+CREATE INDEX IF NOT EXISTS pages_icon ON pages(icon_id);
+"""
+
+
+def keys(url):
+    # An icon is saved for the page and its host, so other pages on the site can fall back to it
+    qurl = QtCore.QUrl(url)
+    host = qurl.host()
+    return [url, f"{qurl.scheme()}://{host}"] if host else [url]
+
+
+def encode(icon, size=SIZE):
+    data = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(data)
+    buffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    icon.pixmap(size, size).save(buffer, 'PNG')
+    return bytes(data)
+
+
+class FaviconCache:
+    def __init__(self, path, limit=256, max_age=90 * 86400):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+        # Decoded icons by icon id, shared by every window and menu, oldest used first
+        self.icons = OrderedDict()
+        self.limit = limit
+        self.prune(time.time() - max_age)
+
+    def icon(self, url):
+        if not url:
+            return QtGui.QIcon()
+        candidates = keys(url)
+        row = self.db.execute(
+            f"SELECT icon_id FROM pages WHERE key IN ({','.join('?' * len(candidates))}) ORDER BY key = ? DESC LIMIT 1",
+            candidates + [url]
+        ).fetchone()
+        return QtGui.QIcon() if row is None else self.decoded(row[0])
+
+    def decoded(self, icon_id):
+        if icon_id in self.icons:
+            self.icons.move_to_end(icon_id)
+            return self.icons[icon_id]
+        row = self.db.execute("SELECT data FROM icons WHERE id = ?", (icon_id,)).fetchone()
+        pixmap = QtGui.QPixmap()
+        if row is not None:
+            pixmap.loadFromData(row[0], 'PNG')
+        icon = QtGui.QIcon(pixmap)
+        self.icons[icon_id] = icon
+        if len(self.icons) > self.limit:
+            self.icons.popitem(last=False)
+        return icon
+
+    def store(self, url, icon):
+        if not url or icon.isNull():
+            return
+        # Identical icons are stored once, most pages of a site share one
+        data = encode(icon)
+        digest = hashlib.sha1(data).digest()
+        with self.db:
+            row = self.db.execute("SELECT id FROM icons WHERE hash = ?", (digest,)).fetchone()
+            icon_id = row[0] if row else self.db.execute(
+                "INSERT INTO icons (hash, data) VALUES (?, ?)", (digest, data)
+            ).lastrowid
+            now = time.time()
+            self.db.executemany(
+                "INSERT INTO pages (key, icon_id, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET icon_id = excluded.icon_id, updated = excluded.updated",
+                [(key, icon_id, now) for key in keys(url)]
+            )
+        if icon_id not in self.icons:
+            self.icons[icon_id] = icon
+            if len(self.icons) > self.limit:
+                self.icons.popitem(last=False)
+
+    def prune(self, before):
+        with self.db:
+            self.db.execute("DELETE FROM pages WHERE updated < ?", (before,))
+            self.db.execute("DELETE FROM icons WHERE id NOT IN (SELECT icon_id FROM pages)")
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM pages")
+            self.db.execute("DELETE FROM icons")
+        self.icons.clear()
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,204 @@
+import os
+import re
+import sys
+import json
+import time
+from collections import deque
+
+import pages
+import startup
+import webprofile
+
+# The offscreen platform has to be chosen before Qt starts
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+preset = webprofile.prepare()
+
+from PySide6 import QtCore, QtWidgets, QtWebEngineCore, QtWebEngineWidgets
+
+from tracing import NAVIGATION_TIMING, NAVIGATION_FIELDS, percentile
+
+app = QtWidgets.QApplication(sys.argv[:1])
+startup.mark("application")
+
+FORMATS = ('screenshot', 'pdf', 'html', 'timing')
+
+
+def resolve_url(text):
+    qurl = pages.resolve(QtCore.QUrl(text))
+    qurl.setScheme(qurl.scheme() or 'http')
+    return qurl.toString()
+
+
+def read_urls(source):
+    # One url per line, blank lines and lines starting with # are skipped
+    lines = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    with lines:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield resolve_url(line)
+
+
+class HeadlessPage(QtWebEngineCore.QWebEnginePage):
+    # The browser's pages ask the user, here there is nobody to ask so permissions are denied and popups
+    # are not opened, which is also what a page gets when a user says no
+    def __init__(self, profile, parent=None):
+        super().__init__(profile, parent)
+
+        self.permissionRequested.connect(lambda permission: permission.deny())
+
+    def createWindow(self, _):
+        return None
+
+
+class Batch(QtCore.QObject):
+    finished = QtCore.Signal()
+
+    def __init__(self, profile, urls, output, formats, concurrency=4, timeout=30000, size=(1280, 800), settle=500, parent=None):
+        super().__init__(parent)
+
+        self.profile = profile
+        self.queue = deque(enumerate(urls))
+        self.output = output
+        self.formats = formats
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.size = size
+        self.settle = settle
+        self.active = {}
+        self.results = []
+        self.start_time = time.monotonic()
+
+    def start(self):
+        for _ in range(self.concurrency):
+            self.next()
+
+    def next(self):
+        if not self.queue:
+            if not self.active:
+                self.finish()
+            return
+        index, url = self.queue.popleft()
+        view = QtWebEngineWidgets.QWebEngineView()
+        view.setPage(HeadlessPage(self.profile, view))
+        view.resize(*self.size)
+        view.show()
+        self.active[view] = {'index': index, 'url': url, 'files': [], 'start': time.monotonic()}
+
+        timer = QtCore.QTimer(view)
+        timer.setSingleShot(True)
+        timer.setInterval(self.timeout)
+        timer.timeout.connect(lambda v=view: self.done(v, "Timed out"))
+        timer.start()
+        view.loadFinished.connect(lambda ok, v=view: self.loaded(v, ok), QtCore.Qt.ConnectionType.SingleShotConnection)
+        view.setUrl(QtCore.QUrl(url))
+
+    def path(self, result, extension):
+        host = re.sub(r'[^\w.-]+', '_', QtCore.QUrl(result['url']).host() or 'page')
+        return os.path.join(self.output, f"{result['index']:04d}-{host}.{extension}")
+
+    def loaded(self, view, ok):
+        result = self.active.get(view)
+        if result is None:
+            return
+        result['load'] = round((time.monotonic() - result['start']) * 1000)
+        if not ok:
+            self.done(view, "Load failed")
+            return
+
+        # Outputs are produced one after another, each step calls the next when it is done
+        steps = [getattr(self, f'save_{name}') for name in self.formats]
+
+        def step():
+            if view not in self.active:
+                return
+            if steps:
+                steps.pop(0)(view, result, step)
+            else:
+                self.done(view)
+        QtCore.QTimer.singleShot(self.settle, step)
+
+    def save_screenshot(self, view, result, then):
+        path = self.path(result, 'png')
+        if view.grab().save(path):
+            result['files'].append(path)
+        then()
+
+    def save_pdf(self, view, result, then):
+        def printed(path, ok):
+            if ok:
+                result['files'].append(path)
+            then()
+        view.page().pdfPrintingFinished.connect(printed, QtCore.Qt.ConnectionType.SingleShotConnection)
+        view.page().printToPdf(self.path(result, 'pdf'))
+
+    def save_html(self, view, result, then):
+        def received(html):
+            path = self.path(result, 'html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            result['files'].append(path)
+            then()
+        view.page().toHtml(received)
+
+    def save_timing(self, view, result, then):
+        def received(timing):
+            try:
+                timing = json.loads(timing) if timing else None
+            except (TypeError, ValueError):
+                timing = None
+            if timing:
+                result['timing'] = {k: timing[k] for k in NAVIGATION_FIELDS if k in timing}
+            then()
+        view.page().runJavaScript(NAVIGATION_TIMING, QtWebEngineCore.QWebEngineScript.ScriptWorldId.ApplicationWorld, received)
+
+    def done(self, view, error=None):
+        result = self.active.pop(view, None)
+        if result is None:
+            return
+        result['ok'] = error is None
+        if error:
+            result['error'] = error
+        result['elapsed'] = round((time.monotonic() - result.pop('start')) * 1000)
+        self.results.append(result)
+        print(f"[{len(self.results)}/{len(self.results) + len(self.active) + len(self.queue)}] "
+              f"{'ok' if result['ok'] else error} {result['elapsed']} ms {result['url']}", file=sys.stderr)
+        view.close()
+        view.deleteLater()
+        self.next()
+
+    def summary(self):
+        results = sorted(self.results, key=lambda r: r['index'])
+        loads = sorted(r['load'] for r in results if r['ok'])
+        return {
+            'urls': len(results),
+            'ok': len(loads),
+            'failed': len(results) - len(loads),
+            'elapsed': round((time.monotonic() - self.start_time) * 1000),
+            'preset': preset['name'],
+            'load': {f'p{p}': percentile(loads, p) for p in (50, 90, 99)} if loads else {},
+            'results': results,
+        }
+
+    def finish(self):
+        summary = self.summary()
+        with open(os.path.join(self.output, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=4)
+        print(f"{summary['ok']}/{summary['urls']} loaded in {summary['elapsed']} ms, "
+              f"summary written to {os.path.join(self.output, 'summary.json')}", file=sys.stderr)
+        self.finished.emit()
+
+
+def run(source, output, formats, concurrency, timeout, extra=()):
+    # Urls given on the command line are loaded after the ones in source
+    os.makedirs(output, exist_ok=True)
+    urls = list(read_urls(source)) + [resolve_url(url) for url in extra]
+    profile, _ = webprofile.create_profile(preset)
+    batch = Batch(profile, urls, output, formats, concurrency, timeout)
+    batch.finished.connect(app.quit)
+    QtCore.QTimer.singleShot(0, batch.start)
+    if urls:
+        app.exec()
+    else:
+        batch.finish()
+    return 0 if batch.summary()['failed'] == 0 else 1
@@ -0,0 +1,126 @@
+import os
+import csv
+import time
+import sqlite3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    last_visit REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS visits (
+    id INTEGER PRIMARY KEY,
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_time ON visits(time);
+CREATE INDEX IF NOT EXISTS visits_url ON visits(url_id);
+CREATE INDEX IF NOT EXISTS urls_last_visit ON urls(last_visit);
+"""
+
+VISIT = "SELECT visits.id, urls.title, urls.url, visits.time FROM visits JOIN urls ON urls.id = visits.url_id"
+ORDER = {
+    'time': "visits.time",
+    'title': "urls.title COLLATE NOCASE",
+    'url': "urls.url",
+}
+# Where each order's value is in a visit row
+KEY = {'time': 3, 'title': 1, 'url': 2}
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def add(self, title, url, when=None):
+        with self.db:
+            return self.insert(title, url, when or time.time())
+
+    def insert(self, title, url, when):
+        url_id = self.db.execute(
+            "INSERT INTO urls (url, title, visit_count, last_visit) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(url) DO UPDATE SET title = excluded.title, "
+            "visit_count = visit_count + 1, last_visit = excluded.last_visit RETURNING id",
+            (url, title, when)
+        ).fetchone()[0]
+        visit_id = self.db.execute("INSERT INTO visits (url_id, time) VALUES (?, ?)", (url_id, when)).lastrowid
+        return visit_id, title, url, when
+
+    def recent(self, limit, after=None):
+        # Keyset paging, rows are (id, title, url, time) newest first
+        if after is None:
+            return self.db.execute(f"{VISIT} ORDER BY visits.time DESC, visits.id DESC LIMIT ?", (limit,)).fetchall()
+        return self.db.execute(
+            f"{VISIT} WHERE (visits.time, visits.id) < (?, ?) ORDER BY visits.time DESC, visits.id DESC LIMIT ?",
+            (after[3], after[0], limit)
+        ).fetchall()
+
+    def search(self, text='', order='time', descending=True, limit=200, after=None):
+        # Filtered and sorted keyset paging for the history window, the next page starts past the row after
+        # so visits removed meanwhile can't shift it, the time index serves the default order
+        direction = "DESC" if descending else "ASC"
+        conditions, params = [], []
+        if text:
+            pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(urls.title LIKE ? ESCAPE '\\' OR urls.url LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        if after is not None:
+            conditions.append(f"({ORDER[order]}, visits.id) {'<' if descending else '>'} (?, ?)")
+            params += [after[KEY[order]], after[0]]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.db.execute(
+            f"{VISIT} {where} ORDER BY {ORDER[order]} {direction}, visits.id {direction} LIMIT ?",
+            params + [limit]
+        ).fetchall()
+
+    def frecency(self):
+        return self.db.execute("SELECT url, title, visit_count, last_visit FROM urls").fetchall()
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM visits").fetchone()[0]
+
+    def remove(self, visit_ids):
+        # Deletes any number of visits in one transaction, returns the urls whose last visit went with them
+        visit_ids = list(visit_ids)
+        with self.db:
+            url_ids = set()
+            for i in range(0, len(visit_ids), 500):
+                chunk = visit_ids[i:i + 500]
+                url_ids.update(row[0] for row in self.db.execute(
+                    f"DELETE FROM visits WHERE id IN ({','.join('?' * len(chunk))}) RETURNING url_id", chunk
+                ))
+            self.db.executemany(
+                "UPDATE urls SET visit_count = (SELECT COUNT(*) FROM visits WHERE url_id = urls.id), "
+                "last_visit = COALESCE((SELECT MAX(time) FROM visits WHERE url_id = urls.id), 0) WHERE id = ?",
+                [(url_id,) for url_id in url_ids]
+            )
+            return [
+                row[0] for url_id in url_ids
+                for row in self.db.execute("DELETE FROM urls WHERE id = ? AND visit_count <= 0 RETURNING url", (url_id,))
+            ]
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM visits")
+            self.db.execute("DELETE FROM urls")
+
+    def import_csv(self, path):
+        # history.csv is stored oldest first, spread the visits before its mtime to keep that order
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            rows = [row for row in list(csv.reader(f))[1:] if len(row) >= 2]
+        start = os.path.getmtime(path) - len(rows)
+        with self.db:
+            for i, (title, url, *_) in enumerate(rows):
+                self.insert(title, url, start + i)
+        os.replace(path, path + '.bak')
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,72 @@
+import json
+import time
+import hashlib
+import getpass
+from collections import deque
+
+from PySide6 import QtCore, QtNetwork
+
+
+def server_name(data):
+    # One channel per user and data directory, so a dev checkout never talks to an installed copy
+    return f"WebX-{hashlib.sha1(f'{getpass.getuser()}:{data}'.encode()).hexdigest()[:16]}"
+
+
+def send(name, command, timeout=2000):
+    # The running instance may still be starting up, so retry until it listens
+    socket = QtNetwork.QLocalSocket()
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        socket.connectToServer(name)
+        if socket.waitForConnected(100):
+            break
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    socket.write(json.dumps(command).encode() + b'\n')
+    socket.waitForBytesWritten(timeout)
+    socket.disconnectFromServer()
+    if socket.state() != QtNetwork.QLocalSocket.LocalSocketState.UnconnectedState:
+        socket.waitForDisconnected(timeout)
+    return True
+
+
+class InstanceServer(QtCore.QObject):
+    command = QtCore.Signal(dict)
+
+    def __init__(self, name, parent=None):
+        super().__init__(parent)
+
+        # Only the lock holder gets here, so anything left under this name is stale
+        QtNetwork.QLocalServer.removeServer(name)
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.setSocketOptions(QtNetwork.QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        self.server.listen(name)
+        self.queue = deque()
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self.read(s))
+            socket.disconnected.connect(socket.deleteLater)
+            self.read(socket)
+
+    def read(self, socket):
+        # Every connection carries its own json line commands, queued in arrival order
+        while socket.canReadLine():
+            try:
+                command = json.loads(bytes(socket.readLine()))
+            except ValueError:
+                continue
+            if isinstance(command, dict):
+                self.queue.append(command)
+        if self.queue:
+            QtCore.QTimer.singleShot(0, self.dispatch)
+
+    def dispatch(self):
+        while self.queue:
+            self.command.emit(self.queue.popleft())
+
+    def close(self):
+        self.server.close()
@@ -0,0 +1,87 @@
+import time
+
+from PySide6 import QtCore, QtWebEngineCore
+
+
+State = QtWebEngineCore.QWebEnginePage.LifecycleState
+
+
+def process_memory(pid):
+    # Proportional set size splits pages shared between renderers, fall back to resident size
+    for name, key in (('smaps_rollup', 'Pss:'), ('status', 'VmRSS:')):
+        try:
+            with open(f'/proc/{pid}/{name}') as f:
+                for line in f:
+                    if line.startswith(key):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return None
+
+
+def memory_pressure():
+    # Share of the last 10 seconds some task was stalled on memory, None without PSI support
+    try:
+        with open('/proc/pressure/memory') as f:
+            return float(f.readline().split()[1].split('=')[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class TabLifecycle(QtCore.QObject):
+    def __init__(self, tabs, freeze_after=300000, memory_budget=2 * 1024 ** 3, pressure=10.0, interval=15000, parent=None):
+        super().__init__(parent)
+
+        # tabs returns every QWebEngineView currently in a tab
+        self.tabs = tabs
+        self.freeze_after = freeze_after / 1000
+        self.memory_budget = memory_budget
+        self.pressure = pressure
+        self.last_active = {}
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+
+    def activate(self, view):
+        self.last_active[view] = time.monotonic()
+        page = view.page()
+        if page and page.lifecycleState() != State.Active:
+            page.setLifecycleState(State.Active)
+
+    def background(self, views):
+        # Hidden tabs that chromium would let go of, least recently used first
+        views = [v for v in views if v.page() and not v.page().isVisible() and v.page().recommendedState() != State.Active]
+        return sorted(views, key=lambda v: self.last_active.get(v, 0))
+
+    def check(self):
+        views = self.tabs()
+        self.last_active = {v: self.last_active.get(v, time.monotonic()) for v in views}
+        background = self.background(views)
+
+        now = time.monotonic()
+        for view in background:
+            if view.page().lifecycleState() == State.Active and now - self.last_active[view] > self.freeze_after:
+                view.page().setLifecycleState(State.Frozen)
+
+        # Renderers can be shared between tabs, so memory is counted per process
+        usage = {}
+        for view in views:
+            pid = view.page().renderProcessPid() if view.page() else 0
+            if pid and pid not in usage:
+                usage[pid] = process_memory(pid) or 0
+        total = sum(usage.values())
+        pressure = memory_pressure()
+        under_pressure = pressure is not None and pressure > self.pressure
+
+        for view in background:
+            if total <= self.memory_budget and not under_pressure:
+                break
+            if view.page().lifecycleState() == State.Discarded:
+                continue
+            pid = view.page().renderProcessPid()
+            view.page().setLifecycleState(State.Discarded)
+            total -= usage.pop(pid, 0)
+            # Give the kernel a sampling period to notice before discarding more under pressure
+            under_pressure = False
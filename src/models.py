@@ -0,0 +1,337 @@
+import time
+
+from PySide6 import QtCore
+
+
+def ranges(rows):
+    # Groups row numbers into contiguous (first, last) ranges, last range first
+    groups = []
+    for row in sorted(set(rows)):
+        if groups and groups[-1][1] == row - 1:
+            groups[-1][1] = row
+        else:
+            groups.append([row, row])
+    return groups[::-1]
+
+
+def split_tags(text):
+    return [t.strip() for t in text.split(',') if t.strip()] if isinstance(text, str) else list(text)
+
+
+class ListModel(QtCore.QAbstractTableModel):
+    def __init__(self, headers, rows=None, parent=None):
+        super().__init__(parent)
+
+        self.headers = headers
+        self.rows = list(rows or [])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+
+    def insert(self, row, values):
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.rows.insert(row, values)
+        self.endInsertRows()
+
+    def append(self, values):
+        self.insert(len(self.rows), values)
+
+    def remove(self, row):
+        self.remove_rows([row])
+
+    def remove_rows(self, rows):
+        for first, last in ranges(rows):
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows.clear()
+        self.endResetModel()
+
+    def sync(self, rows):
+        # Apply the difference to rows as single row removals and inserts
+        new = set(map(tuple, rows))
+        for i in reversed(range(len(self.rows))):
+            if tuple(self.rows[i]) not in new:
+                self.remove(i)
+        old = set(map(tuple, self.rows))
+        for values in rows:
+            if tuple(values) not in old:
+                self.append(values)
+
+
+class BookmarksModel(ListModel):
+    # Rows are [title, url, folder, tags, id] for every bookmark in a BookmarkStore, folders only show as paths
+    def __init__(self, store, icon=None, parent=None):
+        super().__init__(["Name", "Url", "Folder", "Tags"], parent=parent)
+
+        self.store = store
+        self.icon = icon
+        self.reload()
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and index.column() == 0 and role == QtCore.Qt.ItemDataRole.DecorationRole and self.icon:
+            return self.icon(self.rows[index.row()][1])
+        return super().data(index, role)
+
+    def row(self, bookmark):
+        bookmark_id, title, url, folder, _, tags = bookmark
+        return [title, url, self.store.folder_path(folder), tags or '', bookmark_id]
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = [self.row(b) for b in self.store.bookmarks()]
+        self.endResetModel()
+
+    def insert(self, row, values):
+        title, url, *rest = values
+        folder, tags = (rest + ['', ''])[:2]
+        super().insert(row, self.row(self.store.add(title, url, self.store.folder(folder), split_tags(tags))))
+
+    def refresh(self, rows):
+        for row in rows:
+            self.rows[row] = self.row(self.store.get(self.rows[row][4]))
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+    def set_tags(self, rows, tags):
+        self.store.set_tags([self.rows[r][4] for r in rows], split_tags(tags))
+        self.refresh(rows)
+
+    def move(self, rows, folder):
+        self.store.move([self.rows[r][4] for r in rows], self.store.folder(folder))
+        self.refresh(rows)
+
+    def import_html(self, path):
+        count = self.store.import_html(path)
+        self.reload()
+        return count
+
+    def remove_rows(self, rows):
+        self.store.remove([self.rows[r][4] for r in rows])
+        super().remove_rows(rows)
+
+    def clear(self):
+        self.store.clear()
+        super().clear()
+
+
+class VisitsModel(ListModel):
+    # Rows are (id, title, url, time) visits from a HistoryStore
+    def __init__(self, icon=None, parent=None):
+        super().__init__(["Title", "Url", "Visited"], parent=parent)
+
+        self.icon = icon
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and index.column() == 0 and role == QtCore.Qt.ItemDataRole.DecorationRole and self.icon:
+            return self.icon(self.rows[index.row()][2])
+        if index.isValid() and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            value = self.rows[index.row()][index.column() + 1]
+            return time.strftime('%Y-%m-%d %H:%M', time.localtime(value)) if index.column() == 2 else value
+
+
+class HistoryModel(VisitsModel):
+    visited = QtCore.Signal(object)
+    # Ids of removed visits
+    removed = QtCore.Signal(object)
+    # Urls no visit is left for
+    forgotten = QtCore.Signal(object)
+
+    def __init__(self, store, page=200, icon=None, parent=None):
+        super().__init__(icon, parent)
+
+        # Shared list of the newest visits, paged in from the store
+        self.store = store
+        self.page = page
+        self.more = True
+        self.fetchMore(QtCore.QModelIndex())
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self.more
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        rows = self.store.recent(self.page, self.rows[-1] if self.rows else None)
+        self.more = len(rows) == self.page
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows += rows
+            self.endInsertRows()
+
+    def add(self, title, url):
+        visit = self.store.add(title, url)
+        self.insert(0, visit)
+        self.visited.emit(visit)
+
+    def remove_rows(self, rows):
+        self.remove_ids([self.rows[r][0] for r in rows])
+
+    def remove_ids(self, ids):
+        ids = set(ids)
+        urls = self.store.remove(ids)
+        super().remove_rows([r for r, row in enumerate(self.rows) if row[0] in ids])
+        if len(self.rows) < self.page and self.more:
+            self.fetchMore(QtCore.QModelIndex())
+        self.removed.emit(ids)
+        if urls:
+            self.forgotten.emit(urls)
+
+    def clear(self):
+        self.store.clear()
+        self.more = False
+        super().clear()
+
+
+class HistorySearchModel(VisitsModel):
+    ORDER = ['title', 'url', 'time']
+
+    def __init__(self, history, parent=None):
+        super().__init__(history.icon, parent)
+
+        # Per window view of the store, filtered and sorted by sqlite and paged in with fetchMore
+        self.history = history
+        self.text = ''
+        self.order = 'time'
+        self.descending = True
+        self.more = True
+        history.visited.connect(self.visited)
+        history.removed.connect(self.removed)
+        history.modelReset.connect(self.reload)
+        self.reload()
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self.more
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        rows = self.history.store.search(
+            self.text, self.order, self.descending, self.history.page, self.rows[-1] if self.rows else None
+        )
+        self.more = len(rows) == self.history.page
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows += rows
+            self.endInsertRows()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.more = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_filter(self, text):
+        if text != self.text:
+            self.text = text
+            self.reload()
+
+    def sort(self, column, order=QtCore.Qt.SortOrder.AscendingOrder):
+        if column < 0:
+            order, descending = 'time', True
+        else:
+            order, descending = self.ORDER[column], order == QtCore.Qt.SortOrder.DescendingOrder
+        if (order, descending) != (self.order, self.descending):
+            self.order, self.descending = order, descending
+            self.reload()
+
+    def visited(self, visit):
+        # New visits only belong at the top when listing newest first
+        text = self.text.lower()
+        if (self.order, self.descending) == ('time', True) and (text in visit[1].lower() or text in visit[2].lower()):
+            self.insert(0, visit)
+
+    def removed(self, ids):
+        # Removals from any window or the store's own model
+        super().remove_rows([r for r, row in enumerate(self.rows) if row[0] in ids])
+
+    def remove_rows(self, rows):
+        self.history.remove_ids([self.rows[r][0] for r in rows])
+
+
+class PageSearchModel(ListModel):
+    # Rows are (title, url, snippet) pages from a PageIndex whose text matches, best first
+    def __init__(self, index, icon=None, limit=100, parent=None):
+        super().__init__(["Title", "Url", "Match"], parent=parent)
+
+        self.index = index
+        self.icon = icon
+        self.limit = limit
+        self.text = None
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and index.column() == 0 and role == QtCore.Qt.ItemDataRole.DecorationRole and self.icon:
+            return self.icon(self.rows[index.row()][1])
+        return super().data(index, role)
+
+    def set_filter(self, text):
+        if text != self.text:
+            self.text = text
+            self.beginResetModel()
+            self.rows = self.index.search(text, self.limit)
+            self.endResetModel()
+
+    def remove_rows(self, rows):
+        self.index.forget([self.rows[r][1] for r in rows])
+        super().remove_rows(rows)
+
+
+class ModelMenu(QtCore.QObject):
+    # Mirrors the first rows of a model as actions at the top of a menu
+    def __init__(self, menu, model, create_action, limit=None):
+        super().__init__(menu)
+
+        self.menu = menu
+        self.model = model
+        self.create_action = create_action
+        self.limit = limit
+        self.actions = []
+
+        model.rowsInserted.connect(self.rows_inserted)
+        model.rowsRemoved.connect(self.rows_removed)
+        model.modelReset.connect(self.reset)
+        self.reset()
+
+    def size(self):
+        count = self.model.rowCount()
+        return count if self.limit is None else min(count, self.limit)
+
+    def add_action(self, row):
+        after = self.menu.actions()[len(self.actions):]
+        before = self.actions[row] if row < len(self.actions) else after[0] if after else None
+        action = self.create_action(row)
+        self.menu.insertAction(before, action)
+        self.actions.insert(row, action)
+
+    def remove_action(self, row):
+        action = self.actions.pop(row)
+        self.menu.removeAction(action)
+        action.deleteLater()
+
+    def reset(self):
+        while self.actions:
+            self.remove_action(len(self.actions) - 1)
+        for row in range(self.size()):
+            self.add_action(row)
+
+    def rows_inserted(self, _, first, last):
+        for row in range(first, min(last + 1, self.size())):
+            self.add_action(row)
+        while len(self.actions) > self.size():
+            self.remove_action(len(self.actions) - 1)
+
+    def rows_removed(self, _, first, last):
+        for row in reversed(range(first, min(last + 1, len(self.actions)))):
+            self.remove_action(row)
+        for row in range(len(self.actions), self.size()):
+            self.add_action(row)
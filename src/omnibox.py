@@ -0,0 +1,274 @@
+import re
+import math
+import time
+import heapq
+import bisect
+import itertools
+
+from PySide6 import QtCore, QtWidgets
+
+
+HALF_LIFE = 30 * 24 * 3600
+BOOKMARK_WEIGHT = 4
+WORD = re.compile(r"[^\W_]+")
+
+
+def strip_url(url):
+    for prefix in ('https://', 'http://', 'www.'):
+        url = url.removeprefix(prefix)
+    return url
+
+
+def decay(when):
+    # Frecency is stored as log2(sum 2^(t/HALF_LIFE)), so every score decays at the same rate and
+    # their order never has to be recomputed as time passes
+    return when / HALF_LIFE
+
+
+def combine(a, b):
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def word_starts(text):
+    # A word prefix is matched by looking for it after a space
+    return ' ' + ' '.join(WORD.findall(text))
+
+
+class Entry:
+    __slots__ = ('id', 'url', 'title', 'text', 'starts', 'score', 'bookmarked')
+
+    def __init__(self, id, url, title):
+        self.id = id
+        self.url = url
+        self.title = title
+        self.text = f"{strip_url(url)} {title}".lower()
+        self.starts = word_starts(self.text)
+        self.score = None
+        self.bookmarked = False
+
+    def __lt__(self, other):
+        return self.id < other.id
+
+
+class FrecencyIndex:
+    def __init__(self):
+        # ranked holds (-score, entry) best first, words maps each word to the entries containing it
+        self.entries = {}
+        self.ranked = []
+        self.words = {}
+        self.sorted_words = []
+        self.loading = False
+        self.ids = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, rows, done=True):
+        # rows are (url, title, visit_count, last_visit), all visits are counted at the last one
+        self.loading = True
+        for url, title, count, last in rows:
+            entry = self.entry(url, title)
+            entry.score = combine(entry.score, decay(last) + math.log2(max(count, 1)))
+        if done:
+            self.loading = False
+            self.ranked = sorted((-e.score, e) for e in self.entries.values() if e.score is not None)
+            self.sorted_words = sorted(self.words)
+
+    def entry(self, url, title):
+        entry = self.entries.get(url)
+        if entry is None:
+            entry = self.entries[url] = Entry(next(self.ids), url, title)
+            self.index_words(entry)
+        elif title and title != entry.title:
+            old = set(WORD.findall(entry.text))
+            entry.title = title
+            entry.text = f"{strip_url(url)} {title}".lower()
+            entry.starts = word_starts(entry.text)
+            self.unindex_words(entry, old.difference(WORD.findall(entry.text)))
+            self.index_words(entry)
+        return entry
+
+    def index_words(self, entry):
+        for word in WORD.findall(entry.text):
+            entries = self.words.get(word)
+            if entries is None:
+                entries = self.words[word] = set()
+                if not self.loading:
+                    bisect.insort(self.sorted_words, word)
+            entries.add(entry)
+
+    def unindex_words(self, entry, words):
+        for word in words:
+            entries = self.words.get(word)
+            if entries is None:
+                continue
+            entries.discard(entry)
+            if not entries:
+                del self.words[word]
+                if not self.loading:
+                    del self.sorted_words[bisect.bisect_left(self.sorted_words, word)]
+
+    def remove(self, url):
+        entry = self.entries.pop(url, None)
+        if entry is None:
+            return
+        if entry.score is not None and not self.loading:
+            del self.ranked[bisect.bisect_left(self.ranked, (-entry.score, entry))]
+        self.unindex_words(entry, set(WORD.findall(entry.text)))
+
+    def clear(self):
+        self.entries = {}
+        self.ranked = []
+        self.words = {}
+        self.sorted_words = []
+
+    def visit(self, url, title, when=None, weight=1):
+        entry = self.entry(url, title)
+        if self.loading:
+            entry.score = combine(entry.score, decay(when or time.time()) + math.log2(weight))
+            return
+        if entry.score is not None:
+            del self.ranked[bisect.bisect_left(self.ranked, (-entry.score, entry))]
+        entry.score = combine(entry.score, decay(when or time.time()) + math.log2(weight))
+        bisect.insort(self.ranked, (-entry.score, entry))
+
+    def bookmark(self, url, title, bookmarked=True):
+        entry = self.entry(url, title)
+        if bookmarked and not entry.bookmarked:
+            self.visit(url, title, weight=BOOKMARK_WEIGHT)
+        entry.bookmarked = bookmarked
+
+    def matches(self, entry, tokens):
+        # Every typed word has to start a word of the url or title, as the postings match them
+        for token in tokens:
+            if ' ' + token not in entry.starts:
+                return False
+        return True
+
+    def prefixed(self, token):
+        lo = bisect.bisect_left(self.sorted_words, token)
+        hi = bisect.bisect_right(self.sorted_words, token + chr(0x10ffff), lo)
+        return [self.words[word] for word in self.sorted_words[lo:hi]]
+
+    def search(self, text, limit=8):
+        tokens = WORD.findall(text.lower())
+        if not tokens:
+            return []
+
+        # Estimate how many entries the rarest word prefix matches
+        postings = min((self.prefixed(token) for token in tokens), key=lambda p: sum(map(len, p)))
+        estimate = sum(map(len, postings))
+
+        # Dense matches are found quickly walking entries best first, sparse ones through the index
+        if estimate * estimate >= limit * len(self.ranked) / 2:
+            results = []
+            for _, entry in self.ranked:
+                if self.matches(entry, tokens):
+                    results.append(entry)
+                    if len(results) == limit:
+                        break
+            return results
+        candidates = set().union(*postings)
+        if len(tokens) > 1:
+            candidates = [e for e in candidates if self.matches(e, tokens)]
+        return heapq.nsmallest(limit, candidates, key=lambda e: -e.score)
+
+
+def load_index(index, rows, chunk=5000):
+    # Builds the index a chunk per event loop pass so startup never waits on it
+    rows = iter(rows)
+
+    def step():
+        batch = list(itertools.islice(rows, chunk))
+        index.load(batch, done=not batch)
+        if batch:
+            QtCore.QTimer.singleShot(0, step)
+    step()
+
+
+class Omnibox(QtCore.QObject):
+    # Typed text with the index suggestions for it, best first
+    suggested = QtCore.Signal(str, object)
+    # Typed text with the (title, url, snippet) pages whose text matches it, from text_search's thread
+    pages_found = QtCore.Signal(str, object)
+
+    def __init__(self, line_edit, index, limit=8, text_search=None, suggester=None):
+        super().__init__(line_edit)
+
+        self.line_edit = line_edit
+        self.index = index
+        self.limit = limit
+        self.text_search = text_search
+        self.suggester = suggester
+        self.typed = ''
+        self.urls = []
+        self.queries = []
+        self.model = QtCore.QStringListModel(self)
+
+        self.completer = QtWidgets.QCompleter(self.model, self)
+        self.completer.setCompletionMode(QtWidgets.QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.activated.connect(self.activated)
+        line_edit.setCompleter(self.completer)
+        line_edit.textEdited.connect(self.text_edited)
+        self.pages_found.connect(self.add_pages)
+        if suggester:
+            suggester.suggested.connect(self.search_suggested)
+
+    def text_edited(self, text):
+        deleting = len(text) < len(self.typed)
+        self.typed = text
+        entries = self.index.search(text, self.limit)
+        self.suggested.emit(text, entries)
+        self.urls = [e.url for e in entries]
+        self.queries = []
+        self.show(self.urls)
+        # Pages whose text matches fill whatever the titles and urls left, searched off the interface thread,
+        # and search engine suggestions go under the urls, both whenever they come
+        if self.text_search and len(self.urls) < self.limit and len(text) >= 3:
+            self.text_search(text, self.limit, self.found)
+        if self.suggester:
+            self.suggester.request(text)
+
+        # Inline complete the best match when it continues what was typed, but not while deleting
+        if deleting or not text or text.endswith(' '):
+            return
+        for entry in entries:
+            stripped = strip_url(entry.url)
+            if stripped.lower().startswith(text.lower()):
+                self.line_edit.setText(text + stripped[len(text):])
+                self.line_edit.setSelection(len(text), len(stripped) - len(text))
+                break
+
+    def found(self, text, rows):
+        try:
+            self.pages_found.emit(text, rows)
+        except RuntimeError:
+            # The window was closed while its search ran
+            pass
+
+    def add_pages(self, text, rows):
+        if text != self.typed:
+            return
+        self.urls += [url for _, url, _ in rows if url not in self.urls][:self.limit - len(self.urls)]
+        self.show(self.urls + [q for q in self.queries if q not in self.urls])
+
+    def search_suggested(self, text, suggestions):
+        if text != self.typed.strip():
+            return
+        self.queries = suggestions
+        self.show(self.urls + [q for q in self.queries if q not in self.urls])
+
+    def show(self, items):
+        self.model.setStringList(items)
+        if items:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def activated(self, url):
+        self.line_edit.setText(url)
+        self.line_edit.returnPressed.emit()
@@ -0,0 +1,153 @@
+import re
+import sys
+import time
+import queue
+import sqlite3
+import threading
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    indexed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_indexed ON pages(indexed);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(title, body, tokenize='unicode61 remove_diacritics 2');
+"""
+WORD = re.compile(r"[^\W_]+")
+SPACE = re.compile(r"\s+")
+
+
+def match_query(text):
+    # Every word has to appear, the last one may still be being typed
+    words = WORD.findall(text)
+    if not words:
+        return None
+    return ' '.join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+
+
+class PageIndex:
+    def __init__(self, path, max_pages=5000, max_chars=20_000, reindex_after=24 * 3600):
+        self.path = path
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.reindex_after = reindex_after
+
+        # Pages are written and tokenized by a worker with its own connection, searches read through this
+        # one or a searcher thread's, which WAL lets run while the worker writes
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        # When each url was indexed, so navigation never waits on the database to ask
+        self.indexed = dict(self.db.execute("SELECT url, indexed FROM pages"))
+        self.jobs = queue.Queue()
+        self.searches = queue.Queue()
+        self.worker = threading.Thread(target=self.work, daemon=True)
+        self.worker.start()
+        self.searcher = threading.Thread(target=self.search_work, daemon=True)
+        self.searcher.start()
+
+    def wants(self, url):
+        return self.indexed.get(url, 0) < time.time() - self.reindex_after
+
+    def add(self, url, title, text):
+        self.indexed[url] = time.time()
+        self.jobs.put(('add', url, title, text))
+
+    def forget(self, urls):
+        urls = list(urls)
+        for url in urls:
+            self.indexed.pop(url, None)
+        self.jobs.put(('forget', urls))
+
+    def clear(self):
+        self.indexed.clear()
+        self.jobs.put(('clear',))
+
+    def search(self, text, limit=50):
+        # Rows are (title, url, snippet) best match first
+        query = match_query(text)
+        if query is None:
+            return []
+        return self.query(self.db, query, limit)
+
+    def query(self, db, query, limit):
+        return db.execute(
+            "SELECT page_text.title, pages.url, snippet(page_text, 1, '', '', '…', 12) FROM page_text "
+            "JOIN pages ON pages.id = page_text.rowid WHERE page_text MATCH ? ORDER BY bm25(page_text, 4.0, 1.0) LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+    def search_later(self, text, limit, callback):
+        # callback(text, rows) is called on the searcher thread, only the latest waiting search is run
+        self.searches.put((text, limit, callback))
+
+    def search_work(self):
+        db = sqlite3.connect(self.path)
+        while True:
+            job = self.searches.get()
+            while job is not None and not self.searches.empty():
+                job = self.searches.get_nowait()
+            if job is None:
+                break
+            text, limit, callback = job
+            query = match_query(text)
+            try:
+                rows = self.query(db, query, limit) if query else []
+            except sqlite3.Error as e:
+                print(f"Could not search the page index: {e}", file=sys.stderr)
+                rows = []
+            callback(text, rows)
+        db.close()
+
+    def work(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA synchronous=NORMAL")
+        while (job := self.jobs.get()) is not None:
+            try:
+                with db:
+                    match job:
+                        case ('add', url, title, text):
+                            self.write(db, url, title, text)
+                        case ('forget', urls):
+                            self.delete(db, urls)
+                        case ('clear',):
+                            db.execute("DELETE FROM page_text")
+                            db.execute("DELETE FROM pages")
+            except sqlite3.Error as e:
+                print(f"Could not update the page index: {e}", file=sys.stderr)
+            # jobs.join() waits for everything queued to be written
+            self.jobs.task_done()
+        db.close()
+
+    def write(self, db, url, title, text):
+        text = SPACE.sub(' ', text).strip()[:self.max_chars]
+        self.delete(db, [url])
+        page_id = db.execute(
+            "INSERT INTO pages (url, indexed, size) VALUES (?, ?, ?)", (url, time.time(), len(text))
+        ).lastrowid
+        db.execute("INSERT INTO page_text (rowid, title, body) VALUES (?, ?, ?)", (page_id, title, text))
+
+        # The least recently indexed pages make room for new ones
+        excess = db.execute("SELECT COUNT(*) FROM pages").fetchone()[0] - self.max_pages
+        if excess > 0:
+            rows = db.execute("SELECT id, url FROM pages ORDER BY indexed LIMIT ?", (excess,)).fetchall()
+            db.executemany("DELETE FROM page_text WHERE rowid = ?", [(i,) for i, _ in rows])
+            db.executemany("DELETE FROM pages WHERE id = ?", [(i,) for i, _ in rows])
+            for _, evicted in rows:
+                self.indexed.pop(evicted, None)
+
+    def delete(self, db, urls):
+        for url in urls:
+            row = db.execute("DELETE FROM pages WHERE url = ? RETURNING id", (url,)).fetchone()
+            if row:
+                db.execute("DELETE FROM page_text WHERE rowid = ?", row)
+
+    def close(self):
+        self.jobs.put(None)
+        self.searches.put(None)
+        self.worker.join(5)
+        self.searcher.join(5)
+        self.db.close()
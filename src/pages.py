@@ -0,0 +1,109 @@
+import os
+
+from PySide6 import QtCore, QtWebEngineCore
+
+
+SCHEME = b'webx'
+HOME = 'webx://home'
+# Every built in page by host, anything else under webx:// is handed to chromium's own pages
+ROUTES = {
+    'home': 'home.html',
+    'start': 'home.html',
+    'startpage': 'home.html',
+    'newtab': 'home.html',
+    'snake': 'snake.html',
+    'dino': 'snake.html',
+    'performance': 'performance.html',
+    'crashed': 'crashed.html',
+}
+MIME_TYPES = {
+    '.html': b'text/html',
+    '.css': b'text/css',
+    '.js': b'text/javascript',
+    '.json': b'application/json',
+    '.jpeg': b'image/jpeg',
+    '.jpg': b'image/jpeg',
+    '.png': b'image/png',
+    '.svg': b'image/svg+xml',
+    '.ico': b'image/x-icon',
+    '.woff2': b'font/woff2',
+    '.woff': b'font/woff',
+    '.ttf': b'font/ttf',
+}
+
+
+def register_scheme():
+    # Has to run before the QApplication is created
+    scheme = QtWebEngineCore.QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QtWebEngineCore.QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(
+        QtWebEngineCore.QWebEngineUrlScheme.Flag.SecureScheme |
+        QtWebEngineCore.QWebEngineUrlScheme.Flag.LocalScheme |
+        QtWebEngineCore.QWebEngineUrlScheme.Flag.LocalAccessAllowed
+    )
+    QtWebEngineCore.QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def host(qurl):
+    # webx:snake has no authority, so its name is the path
+    return (qurl.host() or qurl.path().strip('/')).lower()
+
+
+def resolve(qurl):
+    # Maps typed built in urls to what is loaded, webx pages first and chrome pages after them
+    match qurl.scheme():
+        case 'webx' | 'chrome' if host(qurl) in ROUTES:
+            return QtCore.QUrl(f"webx://{host(qurl)}")
+        case 'webx':
+            resolved = QtCore.QUrl(qurl)
+            resolved.setScheme('chrome')
+            return resolved
+    return qurl
+
+
+def display(qurl):
+    if qurl.scheme() == 'webx' and ROUTES.get(host(qurl)) == ROUTES['home']:
+        return ''
+    url = qurl.toString()
+    return 'webx' + url.removeprefix('chrome') if qurl.scheme() == 'chrome' else url
+
+
+def is_builtin(qurl):
+    return qurl.scheme() in ('webx', 'chrome', 'view-source')
+
+
+class PageHandler(QtWebEngineCore.QWebEngineUrlSchemeHandler):
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+
+        # Every page and asset is read once, so opening a built in page never touches the disk, pages
+        # in generators are rendered on each request instead, hosts in redirects are sent where they say
+        self.files = {}
+        self.generators = {}
+        self.redirects = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                mime = MIME_TYPES.get(os.path.splitext(name)[1].lower(), b'application/octet-stream')
+                with open(path, 'rb') as f:
+                    self.files[os.path.relpath(path, root).replace(os.sep, '/')] = (mime, QtCore.QByteArray(f.read()))
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        if url.host() in self.redirects:
+            job.redirect(self.redirects[url.host()](url))
+            return
+        path = url.path().strip('/')
+        # Assets are shared between pages, webx://home/bg.jpeg is the same file as webx://snake/bg.jpeg
+        name = path if path else ROUTES.get(url.host())
+        if name in self.generators:
+            mime, data = MIME_TYPES['.html'], QtCore.QByteArray(self.generators[name]())
+        elif name in self.files:
+            mime, data = self.files[name]
+        else:
+            job.fail(QtWebEngineCore.QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        buffer = QtCore.QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QtCore.QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(mime, buffer)
@@ -0,0 +1,101 @@
+import time
+
+from PySide6 import QtCore
+
+from omnibox import strip_url
+from lifecycle import process_memory, memory_pressure
+
+
+def prediction(text, entries):
+    # The suggestion inline completion puts in the url bar, with its share of the frecency of every
+    # suggestion as the confidence, scores are log2 so shares are powers of two apart
+    stripped = text.strip().lower()
+    scores = [e.score for e in entries if e.score is not None]
+    for entry in entries:
+        if strip_url(entry.url).lower().startswith(stripped) and entry.url.startswith(('http://', 'https://')):
+            if entry.score is None:
+                return entry.url, 0
+            return entry.url, 1 / sum(2 ** (s - entry.score) for s in scores)
+    return None, 0
+
+
+class Prerenderer(QtCore.QObject):
+    def __init__(self, create_page, threshold=0.6, min_typed=2, memory_limit=512 * 1024 ** 2, pressure=10.0, expire=30000, parent=None):
+        super().__init__(parent)
+
+        # create_page returns a page on the shared profile with no view, one is loaded at a time
+        self.create_page = create_page
+        self.threshold = threshold
+        self.min_typed = min_typed
+        self.memory_limit = memory_limit
+        self.pressure = pressure
+        self.page = None
+        self.url = None
+        self.started = None
+        self.loaded = None
+        self.stats = {'started': 0, 'used': 0, 'cancelled': 0, 'saved': 0.0}
+
+        # Predictions nobody navigates to are let go of
+        self.timer = QtCore.QTimer(self, singleShot=True, interval=expire)
+        self.timer.timeout.connect(self.cancel)
+
+    def predict(self, text, entries):
+        url, confidence = prediction(text, entries) if len(text.strip()) >= self.min_typed else (None, 0)
+        if url is None or confidence < self.threshold:
+            self.cancel()
+        elif url != self.url:
+            self.start(url)
+
+    def start(self, url):
+        self.cancel()
+        pressure = memory_pressure()
+        if pressure is not None and pressure > self.pressure:
+            return
+        self.page = self.create_page()
+        self.page.loadFinished.connect(self.finished)
+        self.url = url
+        self.started = time.monotonic()
+        self.stats['started'] += 1
+        self.page.setUrl(QtCore.QUrl(url))
+        self.timer.start()
+
+    def finished(self, ok):
+        if self.page is None:
+            return
+        self.loaded = self.loaded or time.monotonic()
+        pid = self.page.renderProcessPid()
+        if not ok or (pid and (process_memory(pid) or 0) > self.memory_limit):
+            self.cancel()
+
+    def take(self, url):
+        # The prerendered page when url is where it was going, schemes aside as typed urls get http added
+        if self.page is None or strip_url(url).rstrip('/') != strip_url(self.url).rstrip('/'):
+            self.cancel()
+            return None
+        page, loaded = self.page, self.loaded is not None
+        page.loadFinished.disconnect(self.finished)
+        self.stats['used'] += 1
+        self.stats['saved'] += (self.loaded or time.monotonic()) - self.started
+        self.reset()
+        return page, loaded
+
+    def cancel(self):
+        if self.page is not None:
+            self.page.deleteLater()
+            self.stats['cancelled'] += 1
+            self.reset()
+
+    def reset(self):
+        self.timer.stop()
+        self.page = self.url = self.started = self.loaded = None
+
+    def report(self):
+        started, used = self.stats['started'], self.stats['used']
+        rate = f"{used / started:.0%}" if started else "-"
+        average = f"{self.stats['saved'] / used * 1000:.0f} ms" if used else "-"
+        return (
+            "<h2>Prerendering</h2><table><tr><th>Prerenders</th><th>Used</th><th>Cancelled</th><th>Hit Rate</th>"
+            "<th>Time Saved</th><th>Average Saved</th></tr>"
+            f"<tr><td>{started}</td><td>{used}</td><td>{self.stats['cancelled']}</td><td>{rate}</td>"
+            f"<td>{self.stats['saved']:.1f} s</td><td>{average}</td></tr></table>"
+        )
@@ -0,0 +1,80 @@
+import os
+import json
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+
+def string_to_icon(string):
+    pixmap = QtGui.QPixmap()
+    if string:
+        pixmap.loadFromData(QtCore.QByteArray.fromBase64(string.encode()), 'PNG')
+    return QtGui.QIcon(pixmap)
+
+
+def history_to_string(history):
+    # QWebEngineHistory can only be streamed where the bindings expose its QDataStream operators
+    data = QtCore.QByteArray()
+    stream = QtCore.QDataStream(data, QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    try:
+        stream << history
+    except TypeError:
+        return None
+    return bytes(data.toBase64()).decode()
+
+
+def string_to_history(string, history):
+    stream = QtCore.QDataStream(QtCore.QByteArray.fromBase64(string.encode()))
+    try:
+        stream >> history
+    except TypeError:
+        return False
+    return True
+
+
+class LazyTab(QtWidgets.QWidget):
+    # Stands in for a restored tab until it is first activated
+    def __init__(self, state, icon):
+        super().__init__()
+
+        # Icons come from the favicon cache, sessions saved before it have their own
+        self.state = state
+        self.icon = icon if not icon.isNull() else string_to_icon(state.get('icon'))
+        layout = QtWidgets.QVBoxLayout(self)
+        label = QtWidgets.QLabel(state.get('title') or state['url'])
+        label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(label)
+
+    def url(self):
+        return QtCore.QUrl(self.state['url'])
+
+
+class Session(QtCore.QObject):
+    def __init__(self, path, collect, delay=1000, parent=None):
+        super().__init__(parent)
+
+        # collect returns the current session as a json serializable dict
+        self.path = path
+        self.collect = collect
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.save)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def changed(self):
+        # Coalesce bursts of tab changes into one write
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def save(self):
+        self.timer.stop()
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.collect(), f)
+        os.replace(temp, self.path)
@@ -0,0 +1,89 @@
+import sys
+import json
+import time
+import bisect
+import logging
+import threading
+import traceback
+import logging.handlers
+
+from PySide6 import QtCore
+
+
+# Upper bounds in milliseconds of how late a heartbeat can be in each histogram bucket
+BUCKETS = (4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+
+class StallDetector(QtCore.QObject):
+    def __init__(self, path, threshold=200, interval=50, max_bytes=2 * 1024 ** 2, backups=2, parent=None):
+        super().__init__(parent)
+
+        # A heartbeat posted through the event loop every interval, a watchdog thread captures the main
+        # thread's stack when it goes quiet for longer than threshold
+        self.threshold = threshold / 1000
+        self.interval = interval
+        self.main = threading.main_thread().ident
+        self.beat = time.monotonic()
+        self.captured = None
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.stalls = 0
+        self.longest = 0
+        self.stopping = threading.Event()
+
+        self.log = logging.getLogger('webx.stalls')
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.log.addHandler(handler)
+
+        self.timer = QtCore.QTimer(self, interval=interval, timerType=QtCore.Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.heartbeat)
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+
+    def start(self):
+        self.beat = time.monotonic()
+        self.timer.start()
+        self.thread.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.stopping.set()
+
+    def heartbeat(self):
+        now = time.monotonic()
+        previous, self.beat = self.beat, now
+        late = (now - previous) * 1000 - self.interval
+        self.histogram[bisect.bisect_right(BUCKETS, late)] += 1
+
+        # The watchdog saw this gap while it lasted, it is written once the loop is back, a capture of any
+        # other beat came too late to be a stall
+        captured, self.captured = self.captured, None
+        if captured and captured[0] == previous:
+            self.stalls += 1
+            self.longest = max(self.longest, late)
+            self.log.info(json.dumps({'time': time.time(), 'duration': round(late), 'stack': captured[1]}))
+            print(f"Event loop stalled for {late:.0f} ms in {' '.join(captured[1][-1].split()) if captured[1] else 'native code'}", file=sys.stderr)
+
+    def watch(self):
+        while not self.stopping.wait(self.threshold / 4):
+            beat = self.beat
+            if self.captured is None and time.monotonic() - beat > self.threshold:
+                frame = sys._current_frames().get(self.main)
+                stack = traceback.format_stack(frame) if frame else []
+                # The loop may have come back while the stack was taken
+                if self.beat == beat:
+                    self.captured = (beat, stack)
+
+    def report(self):
+        total = sum(self.histogram) or 1
+        labels = [f"&lt; {b} ms" for b in BUCKETS] + [f"&ge; {BUCKETS[-1]} ms"]
+        rows = ''.join(
+            f"<tr><td>{label}</td><td>{count}</td><td>{count / total:.1%}</td></tr>"
+            for label, count in zip(labels, self.histogram)
+        )
+        return (
+            f"<h2>Event Loop Latency</h2><p>{self.stalls} stalls over {self.threshold * 1000:.0f} ms, "
+            f"longest {self.longest:.0f} ms, heartbeat every {self.interval} ms</p>"
+            f"<table><tr><th>Heartbeat Late By</th><th>Beats</th><th>Share</th></tr>{rows}</table>"
+        )
@@ -0,0 +1,15 @@
+import sys
+import time
+
+
+START = time.perf_counter()
+enabled = False
+seen = set()
+
+
+def mark(phase, once=False):
+    # Prints the time since launch for each startup phase when --trace-startup is given
+    if not enabled or (once and phase in seen):
+        return
+    seen.add(phase)
+    print(f"[startup] {(time.perf_counter() - START) * 1000:9.1f} ms  {phase}", file=sys.stderr, flush=True)
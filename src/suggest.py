@@ -0,0 +1,92 @@
+import json
+import collections
+
+from PySide6 import QtCore, QtNetwork
+
+from config import query_url
+
+
+def parse(data):
+    # OpenSearch suggestions are [query, [suggestion, ...], ...]
+    try:
+        response = json.loads(bytes(data).decode('utf-8', 'replace'))
+    except ValueError:
+        return None
+    if not isinstance(response, list) or len(response) < 2 or not isinstance(response[1], list):
+        return None
+    return [s for s in response[1] if isinstance(s, str)]
+
+
+class Suggester(QtCore.QObject):
+    # Typed text with the search engine's suggestions for it
+    suggested = QtCore.Signal(str, list)
+
+    def __init__(self, url, delay=150, timeout=1500, cache_size=256, limit=8, parent=None):
+        super().__init__(parent)
+
+        # url takes the encoded query in place of {}, one request is in flight at a time and only for the
+        # latest text, answers are kept by what was typed so going back over it costs nothing
+        self.url = url
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.limit = limit
+        self.cache = collections.OrderedDict()
+        self.text = ''
+        self.reply = None
+        self.manager = QtNetwork.QNetworkAccessManager(self)
+
+        self.timer = QtCore.QTimer(self, singleShot=True, interval=delay)
+        self.timer.timeout.connect(self.fetch)
+
+    def request(self, text):
+        text = text.strip()
+        key = text.lower()
+        if key in self.cache:
+            self.abort()
+            self.timer.stop()
+            self.text = text
+            self.cache.move_to_end(key)
+            self.suggested.emit(text, self.cache[key])
+            return
+        if text == self.text and (self.reply is not None or self.timer.isActive()):
+            return
+        self.text = text
+        self.abort()
+        if not text:
+            self.timer.stop()
+            return
+
+        # Until the answer comes the longest cached prefix still has the suggestions that continue the text
+        for end in range(len(key) - 1, 0, -1):
+            cached = self.cache.get(key[:end])
+            if cached is not None:
+                self.suggested.emit(text, [s for s in cached if s.lower().startswith(key)])
+                break
+        self.timer.start()
+
+    def fetch(self):
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(query_url(self.url, self.text)))
+        request.setTransferTimeout(self.timeout)
+        self.reply = self.manager.get(request)
+        self.reply.finished.connect(lambda reply=self.reply, text=self.text: self.finished(reply, text))
+
+    def finished(self, reply, text):
+        reply.deleteLater()
+        if reply is self.reply:
+            self.reply = None
+        if reply.error() != QtNetwork.QNetworkReply.NetworkError.NoError:
+            return
+        suggestions = parse(reply.readAll())
+        if suggestions is None:
+            return
+        suggestions = suggestions[:self.limit]
+        self.cache[text.lower()] = suggestions
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        if text == self.text:
+            self.suggested.emit(text, suggestions)
+
+    def abort(self):
+        if self.reply is not None:
+            reply, self.reply = self.reply, None
+            reply.abort()
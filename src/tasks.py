@@ -0,0 +1,100 @@
+import os
+import time
+
+from PySide6 import QtCore
+
+from models import ListModel
+from downloads import byte_to_string
+
+
+TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+SortRole = QtCore.Qt.ItemDataRole.UserRole
+
+
+def process_stats(pid):
+    # Resident and proportional set size in bytes and cpu time in clock ticks, None where /proc has no answer
+    rss = pss = ticks = None
+    for name, key in (('status', 'VmRSS:'), ('smaps_rollup', 'Pss:')):
+        try:
+            with open(f'/proc/{pid}/{name}') as f:
+                for line in f:
+                    if line.startswith(key):
+                        value = int(line.split()[1]) * 1024
+                        rss, pss = (value, pss) if name == 'status' else (rss, value)
+                        break
+        except (OSError, ValueError):
+            continue
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # The command name may contain spaces, utime and stime follow it as the 12th and 13th fields
+            fields = f.read().rpartition(')')[2].split()
+            ticks = int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        pass
+    return rss, pss, ticks
+
+
+class TasksModel(ListModel):
+    # Rows are [window, title, pid, rss, pss, cpu] with views holding the tab of each row
+    def __init__(self, tabs, interval=2000, parent=None):
+        super().__init__(["Window", "Tab", "Process", "Memory", "Proportional Memory", "CPU"], parent=parent)
+
+        # tabs returns (window number, title, view or None) for every tab
+        self.tabs = tabs
+        self.views = []
+        self.samples = {}
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.sample)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == SortRole:
+            return -1 if value is None else value
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        match index.column():
+            case 0:
+                return f"Window {value}"
+            case 2:
+                return str(value) if value else "Not running"
+            case 3 | 4:
+                return byte_to_string(value) if value is not None else ""
+            case 5:
+                return f"{value:.1f}%" if value is not None else ""
+        return value
+
+    def start(self):
+        self.sample()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def sample(self):
+        now = time.monotonic()
+        rows, views, samples = [], [], {}
+        for window, title, view in self.tabs():
+            pid = view.page().renderProcessPid() if view is not None and view.page() else 0
+            rss = pss = cpu = None
+            if pid:
+                rss, pss, ticks = process_stats(pid)
+                # Cpu use since the last sample, tabs sharing a renderer show the same process
+                samples[pid] = samples.get(pid) or (now, ticks)
+                then, before = self.samples.get(pid, (None, None))
+                if ticks is not None and before is not None and now > then:
+                    cpu = (ticks - before) / TICKS / (now - then) * 100
+            rows.append([window, title, pid, rss, pss, cpu])
+            views.append(view)
+        self.samples = samples
+
+        if views == self.views:
+            self.rows = rows
+            if rows:
+                self.dataChanged.emit(self.index(0, 0), self.index(len(rows) - 1, len(self.headers) - 1))
+        else:
+            self.beginResetModel()
+            self.rows, self.views = rows, views
+            self.endResetModel()
@@ -0,0 +1,166 @@
+import os
+import json
+import math
+import html
+import time
+import logging
+import logging.handlers
+from collections import defaultdict, deque
+
+from PySide6 import QtCore, QtWebEngineCore
+
+
+MILESTONES = (25, 50, 75, 100)
+NAVIGATION_TIMING = "JSON.stringify(performance.getEntriesByType('navigation')[0] || null)"
+NAVIGATION_FIELDS = (
+    'type', 'nextHopProtocol', 'transferSize', 'encodedBodySize', 'domainLookupStart', 'domainLookupEnd',
+    'connectStart', 'connectEnd', 'requestStart', 'responseStart', 'responseEnd', 'domInteractive',
+    'domContentLoadedEventEnd', 'loadEventEnd',
+)
+# Report columns as (heading, function of a record returning milliseconds or None)
+METRICS = (
+    ("Commit", lambda r: r.get('commit')),
+    ("First Byte", lambda r: (r.get('navigation') or {}).get('responseStart')),
+    ("DOM Ready", lambda r: (r.get('navigation') or {}).get('domContentLoadedEventEnd')),
+    ("Load", lambda r: (r.get('navigation') or {}).get('loadEventEnd')),
+    ("Finished", lambda r: r.get('finish')),
+)
+
+
+def percentile(values, p):
+    # Nearest rank on sorted values
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+class Tracer(QtCore.QObject):
+    def __init__(self, path, tags, max_bytes=5 * 1024 ** 2, backups=3, samples=1000, parent=None):
+        super().__init__(parent)
+
+        # tags are added to every record, so traces from different builds and presets can be compared
+        self.path = path
+        self.tags = tags
+        self.backups = backups
+        self.samples = samples
+        self.pending = {}
+        # Report tables by title, each group holds its load count and the metrics of its latest loads,
+        # read from the files on the first report and kept up to date after that
+        self.groups = None
+        # Functions returning more html for the report
+        self.sections = []
+        self.log = logging.getLogger('webx.trace')
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.log.addHandler(handler)
+
+    def watch(self, view):
+        view.loadStarted.connect(lambda v=view: self.started(v))
+        view.urlChanged.connect(lambda _, v=view: self.committed(v))
+        view.loadProgress.connect(lambda progress, v=view: self.progressed(v, progress))
+        view.loadFinished.connect(lambda ok, v=view: self.finished(v, ok))
+        view.destroyed.connect(lambda _=None, v=view: self.pending.pop(v, None))
+
+    def elapsed(self, record):
+        return round((time.monotonic() - record['start']) * 1000)
+
+    def started(self, view):
+        self.pending[view] = {'start': time.monotonic(), 'time': time.time(), 'progress': {}}
+
+    def committed(self, view):
+        record = self.pending.get(view)
+        if record and 'commit' not in record:
+            record['commit'] = self.elapsed(record)
+
+    def progressed(self, view, progress):
+        record = self.pending.get(view)
+        if record:
+            for milestone in MILESTONES:
+                if progress >= milestone and milestone not in record['progress']:
+                    record['progress'][milestone] = self.elapsed(record)
+
+    def finished(self, view, ok):
+        record = self.pending.pop(view, None)
+        url = view.url()
+        if not record or url.scheme() not in ('http', 'https'):
+            return
+        record['finish'] = self.elapsed(record)
+        del record['start']
+        record |= {'url': url.toString(), 'origin': f"{url.scheme()}://{url.authority()}", 'ok': ok}
+        view.page().runJavaScript(
+            NAVIGATION_TIMING,
+            QtWebEngineCore.QWebEngineScript.ScriptWorldId.ApplicationWorld,
+            lambda result: self.write(record, result)
+        )
+
+    def write(self, record, timing):
+        try:
+            timing = json.loads(timing) if timing else None
+        except (TypeError, ValueError):
+            timing = None
+        if timing:
+            record['navigation'] = {
+                k: round(timing[k], 1) if isinstance(timing[k], float) else timing[k]
+                for k in NAVIGATION_FIELDS if k in timing
+            }
+        record |= self.tags
+        self.log.info(json.dumps(record))
+        if self.groups is not None:
+            self.aggregate(record)
+
+    def records(self):
+        # Oldest rotated file first
+        for path in [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except OSError:
+                continue
+
+    def aggregate(self, record):
+        metrics = tuple(metric(record) for _, metric in METRICS)
+        for title, name in (("Version and Preset", f"{record.get('version')} {record.get('preset')}"), ("Origin", record.get('origin'))):
+            group = self.groups[title][name]
+            group[0] += 1
+            group[1].append(metrics)
+
+    def table(self, title, groups, limit=100):
+        rows = []
+        for name, (count, samples) in sorted(groups.items(), key=lambda g: -g[1][0])[:limit]:
+            cells = [f"<td>{html.escape(str(name))}</td><td>{count}</td>"]
+            for i in range(len(METRICS)):
+                values = sorted(m[i] for m in samples if m[i] is not None)
+                cells.append(
+                    f"<td>{' / '.join(str(round(percentile(values, p))) for p in (50, 90, 99))}</td>" if values else "<td></td>"
+                )
+            rows.append(f"<tr>{''.join(cells)}</tr>")
+        headings = ''.join(f"<th>{h} p50 / p90 / p99 ms</th>" for h, _ in METRICS)
+        return f"<h2>{title}</h2><table><tr><th>{title}</th><th>Loads</th>{headings}</tr>{''.join(rows)}</table>"
+
+    def report(self):
+        if self.groups is None:
+            self.groups = defaultdict(lambda: defaultdict(lambda: [0, deque(maxlen=self.samples)]))
+            for record in self.records():
+                self.aggregate(record)
+        return f"""<html lang="en">
+    <head>
+        <title>WebX Performance</title>
+        <style>
+            body {{ font-family: sans-serif; margin: 2em; }}
+            table {{ border-collapse: collapse; }}
+            th, td {{ border: 1px solid #aaa; padding: 0.3em 0.6em; text-align: right; }}
+            td:first-child {{ text-align: left; }}
+        </style>
+    </head>
+    <body>
+        <h1>WebX Performance</h1>
+        <p>Navigation timings from {html.escape(os.path.basename(self.path))}</p>
+        {self.table("Version and Preset", self.groups["Version and Preset"])}
+        {self.table("Origin", self.groups["Origin"])}
+        {''.join(section() for section in self.sections)}
+    </body>
+</html>""".encode()
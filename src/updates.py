@@ -0,0 +1,73 @@
+import json
+import time
+
+from PySide6 import QtCore, QtNetwork
+
+
+class UpdateChecker(QtCore.QObject):
+    # Emits the latest published version, or None when it could not be fetched
+    checked = QtCore.Signal(object)
+
+    def __init__(self, url, cache_path, ttl=6 * 3600, timeout=5000, parent=None):
+        super().__init__(parent)
+
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.reply = None
+        self.manager = QtNetwork.QNetworkAccessManager(self)
+        self.manager.setTransferTimeout(timeout)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def fresh(self):
+        return self.cache.get('latest') is not None and time.time() - self.cache.get('checked_at', 0) < self.ttl
+
+    def check(self, force=False):
+        if not force and self.fresh():
+            QtCore.QTimer.singleShot(0, lambda: self.checked.emit(self.cache['latest']))
+            return
+        if self.reply:
+            return
+
+        # Revalidate what is cached so an unchanged file comes back as an empty 304
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(self.url))
+        if self.cache.get('etag'):
+            request.setRawHeader(b'If-None-Match', self.cache['etag'].encode())
+        if self.cache.get('modified'):
+            request.setRawHeader(b'If-Modified-Since', self.cache['modified'].encode())
+        self.reply = self.manager.get(request)
+        self.reply.finished.connect(self.finished)
+
+    def finished(self):
+        reply, self.reply = self.reply, None
+        reply.deleteLater()
+        status = reply.attribute(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+
+        latest = None
+        if reply.error() == QtNetwork.QNetworkReply.NetworkError.NoError:
+            if status == 304:
+                latest = self.cache.get('latest')
+            else:
+                try:
+                    latest = float(bytes(reply.readAll()).decode().strip())
+                except ValueError:
+                    pass
+                self.cache['etag'] = bytes(reply.rawHeader('ETag')).decode() or None
+                self.cache['modified'] = bytes(reply.rawHeader('Last-Modified')).decode() or None
+
+        if latest is not None:
+            self.cache['latest'] = latest
+            self.cache['checked_at'] = time.time()
+            self.save()
+        self.checked.emit(latest)
+
+    def save(self):
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f)
+        except OSError:
+            pass
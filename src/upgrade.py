@@ -8,15 +8,27 @@
 # nuitka-project: --windows-icon-from-ico=src/icons/WebX.ico
 
 import os
+import json
+import time
+import queue
+import hashlib
 import tempfile
-import requests
+import threading
 import subprocess
+import requests
 import tkinter as tk
-from threading import Thread
+from tkinter import messagebox
 
 
-LATEST = "https://raw.githubusercontent.com/not-immortalcoding/webx/refs/heads/main/latest_version.txt"
-    
+LATEST = os.getenv("WEBX_VERSION_URL", "https://raw.githubusercontent.com/not-immortalcoding/webx/refs/heads/main/latest_version.txt")
+RELEASE = os.getenv("WEBX_RELEASE_URL", "https://github.com/Orlando-Huang/webx/releases/download/v{version}/WebX Installer.exe")
+DOWNLOADS = os.path.join(tempfile.gettempdir(), 'webx_upgrade')
+SEGMENTS = 4
+CHUNK = 64 * 1024
+RETRIES = 3
+TIMEOUT = 15
+PROGRESS_INTERVAL = 100
+
 
 def byte_to_string(byte):
     match byte:
@@ -32,32 +44,218 @@ def byte_to_string(byte):
             return f"{byte / (1024 ** 3):.2f} GB"
 
 
-def download():
-    upgrade_url = f"https://github.com/Orlando-Huang/webx/releases/download/v{requests.get(LATEST).text}/WebX Installer.exe"
-    with requests.get(upgrade_url, stream=True) as r:
-        r.raise_for_status()
-        total_size = int(r.headers.get("Content-Length", 0))
-        downloaded = 0
-        with tempfile.TemporaryDirectory() as temp:
-            webx_upgrade = os.path.join(temp, 'webx_upgrade.exe')
-            with open(webx_upgrade, "wb") as f:
-                for chunk in r.iter_content(8192):
-                    if chunk:
+def published_checksum(url):
+    # Releases publish "<sha256> <name>" next to the installer, older ones have none and give None
+    r = requests.get(url + '.sha256', timeout=TIMEOUT)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    checksum = r.text.split()[0].lower()
+    if len(checksum) != 64:
+        raise ValueError("Malformed checksum")
+    return checksum
+
+
+def file_checksum(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_state(path, url, size, etag):
+    # The partial file is only trusted when it belongs to the same remote file
+    try:
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (state.get('url'), state.get('size'), state.get('etag')) != (url, size, etag) or not os.path.exists(path):
+        return None
+    return state
+
+
+def save_state(path, state, lock):
+    with lock:
+        data = json.dumps(state)
+    with open(path + '.json.tmp', 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(path + '.json.tmp', path + '.json')
+
+
+def fetch_segment(session, url, path, segment, lock, cancelled):
+    # segment is [start, end, done], end inclusive, done bytes already written from start
+    for attempt in range(RETRIES):
+        start, end, done = segment
+        if start + done > end:
+            return
+        try:
+            headers = {'Range': f'bytes={start + done}-{end}'}
+            with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise IOError("Server ignored the range request")
+                with open(path, 'r+b') as f:
+                    f.seek(start + done)
+                    for chunk in r.iter_content(CHUNK):
+                        if cancelled.is_set():
+                            return
                         f.write(chunk)
-                        downloaded += len(chunk)
-                        label.config(text=f'WebX Upgrade downloaded {byte_to_string(downloaded)}/{byte_to_string(total_size)}')
-                label.config(text="WebX Upgrade download finished!")
+                        f.flush()
+                        with lock:
+                            segment[2] += len(chunk)
+            return
+        except (requests.RequestException, IOError):
+            if attempt == RETRIES - 1:
+                raise
+
+
+def fetch_whole(session, url, path, state, lock, cancelled):
+    # Without range support the file can only be fetched in one piece from the start
+    segment = state['segments'][0] = [0, max(state['size'] - 1, 0), 0]
+    with session.get(url, stream=True, timeout=TIMEOUT) as r:
+        r.raise_for_status()
+        with open(path, 'wb') as f:
+            for chunk in r.iter_content(CHUNK):
+                if cancelled.is_set():
+                    return
+                f.write(chunk)
+                with lock:
+                    segment[2] += len(chunk)
+
+
+def download(url, path, checksum=None, progress=lambda done, total: None, segments=SEGMENTS, cancelled=None):
+    # Fetches url into path through concurrent range requests, resuming from path.part, the partial file
+    # belongs to url itself as redirects to release assets are signed and change on every request
+    cancelled = cancelled or threading.Event()
+    part = path + '.part'
+    lock = threading.Lock()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with requests.Session() as session:
+        head = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+        head.raise_for_status()
+        target = head.url
+        size = int(head.headers.get('Content-Length', 0))
+        ranged = head.headers.get('Accept-Ranges') == 'bytes' and size > 0
+
+        state = load_state(part, url, size, head.headers.get('ETag')) if ranged else None
+        if state is None:
+            step = -(-size // segments) if ranged else size
+            state = {
+                'url': url, 'size': size, 'etag': head.headers.get('ETag'),
+                'segments': [[s, min(s + step, size) - 1, 0] for s in range(0, size, step)] if ranged else [[0, size - 1, 0]]
+            }
+            with open(part, 'wb') as f:
+                f.truncate(size)
+            save_state(part, state, lock)
+
+        errors = []
+
+        def run(fetch, *args):
+            try:
+                fetch(session, target, part, *args, lock, cancelled)
+            except Exception as e:
+                errors.append(e)
+                cancelled.set()
+
+        if ranged:
+            workers = [threading.Thread(target=run, args=(fetch_segment, s), daemon=True) for s in state['segments']]
+        else:
+            workers = [threading.Thread(target=run, args=(fetch_whole, state), daemon=True)]
+        for worker in workers:
+            worker.start()
+
+        # Persist progress while the workers run so an interruption loses almost nothing
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(PROGRESS_INTERVAL / 1000)
+            with lock:
+                done = sum(s[2] for s in state['segments'])
+            progress(done, size)
+            if ranged:
+                save_state(part, state, lock)
+        if errors:
+            raise errors[0]
+        if cancelled.is_set():
+            return None
+
+    if checksum and file_checksum(part) != checksum:
+        os.remove(part)
+        if os.path.exists(part + '.json'):
+            os.remove(part + '.json')
+        raise ValueError("Checksum mismatch, the download was discarded")
+    os.replace(part, path)
+    if os.path.exists(part + '.json'):
+        os.remove(part + '.json')
+    return path
+
+
+def upgrade(events):
+    try:
+        version = requests.get(LATEST, timeout=TIMEOUT).text.strip()
+        url = RELEASE.format(version=version)
+        checksum = published_checksum(url)
+        if checksum is None:
+            events.put(('notice', "No checksum was published for this release, the installer cannot be verified"))
+        path = download(
+            url,
+            os.path.join(DOWNLOADS, 'webx_upgrade.exe'),
+            checksum,
+            lambda done, total: events.put(('progress', done, total))
+        )
+        events.put(('done', path, checksum is not None))
+    except Exception as e:
+        events.put(('error', str(e)))
+
+
+def poll(root, label, notice, events):
+    # Tk is only touched from its own loop, progress is coalesced to the latest value
+    event = None
+    try:
+        while True:
+            event = events.get_nowait()
+            if event[0] == 'notice':
+                notice.config(text=event[1])
+            elif event[0] != 'progress':
+                break
+    except queue.Empty:
+        pass
+
+    match event:
+        case ('progress', done, total):
+            label.config(text=f'WebX Upgrade downloaded {byte_to_string(done)}/{byte_to_string(total)}')
+        case ('done', path, verified):
+            label.config(text="WebX Upgrade download finished!")
+            if not verified and not messagebox.askyesno(
+                "WebX Upgrade", "No checksum was published for this release, so the installer could not be verified.\n\nRun it anyway?", parent=root
+            ):
+                os.remove(path)
+                root.destroy()
+                return
             root.destroy()
-            subprocess.run([webx_upgrade])
+            subprocess.run([path])
+            os.remove(path)
+            return
+        case ('error', message):
+            label.config(text=f"WebX Upgrade failed: {message}")
+            root.protocol("WM_DELETE_WINDOW", root.destroy)
+            return
+    root.after(PROGRESS_INTERVAL, poll, root, label, notice, events)
 
 
-root = tk.Tk(className="WebX Upgrade")
-root.title("WebX Upgrade")
-root.iconphoto(False, tk.PhotoImage(file=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'icons', 'WebX.png')))
-label = tk.Label(root, text="Starting WebX Upgrade download...")
-label.pack()
-root.protocol("WM_DELETE_WINDOW", lambda: None)
-root.resizable(False, False)
+if __name__ == '__main__':
+    root = tk.Tk(className="WebX Upgrade")
+    root.title("WebX Upgrade")
+    root.iconphoto(False, tk.PhotoImage(file=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'icons', 'WebX.png')))
+    label = tk.Label(root, text="Starting WebX Upgrade download...")
+    label.pack()
+    notice = tk.Label(root)
+    notice.pack()
+    root.protocol("WM_DELETE_WINDOW", lambda: None)
+    root.resizable(False, False)
 
-Thread(target=download, daemon=True).start()
-root.mainloop()
\ No newline at end of file
+    events = queue.Queue()
+    threading.Thread(target=upgrade, args=(events,), daemon=True).start()
+    root.after(PROGRESS_INTERVAL, poll, root, label, notice, events)
+    root.mainloop()
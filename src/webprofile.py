@@ -0,0 +1,59 @@
+import os
+import threading
+
+from PySide6 import QtCore, QtWebEngineCore
+
+import config
+import pages
+import adblock
+from constants import HTML, DATA
+
+
+FILTERS = os.path.join(DATA, 'filters')
+CACHE_TYPES = {
+    'disk': QtWebEngineCore.QWebEngineProfile.HttpCacheType.DiskHttpCache,
+    'memory': QtWebEngineCore.QWebEngineProfile.HttpCacheType.MemoryHttpCache,
+    'none': QtWebEngineCore.QWebEngineProfile.HttpCacheType.NoCache,
+}
+
+
+def prepare():
+    # Has to run before the QApplication is created, chromium reads its flags once
+    preset = config.load(os.path.join(DATA, 'config.json'))
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = config.chromium_flags(preset)
+    pages.register_scheme()
+    return preset
+
+
+def create_profile(preset):
+    profile = QtWebEngineCore.QWebEngineProfile('WebX')
+    profile.setPersistentStoragePath(DATA)
+    profile.setHttpCacheType(CACHE_TYPES.get(preset['http_cache'], CACHE_TYPES['disk']))
+    profile.setHttpCacheMaximumSize(preset['http_cache_size'] * 1024 ** 2)
+    for name, enabled in preset['settings'].items():
+        attribute = getattr(QtWebEngineCore.QWebEngineSettings.WebAttribute, name, None)
+        if attribute is not None:
+            profile.settings().setAttribute(attribute, enabled)
+
+    page_handler = pages.PageHandler(HTML, profile)
+    profile.installUrlSchemeHandler(pages.SCHEME, page_handler)
+
+    # webx://search?q= from built in pages goes to the search engine in config.json
+    search = config.search_engine(os.path.join(DATA, 'config.json'))['search']
+
+    def search_redirect(qurl):
+        query = QtCore.QUrlQuery(qurl).queryItemValue('q', QtCore.QUrl.ComponentFormattingOption.FullyDecoded)
+        return QtCore.QUrl(config.query_url(search, query))
+
+    page_handler.redirects['search'] = search_redirect
+
+    # Block requests matched by the filter lists dropped in the filters folder
+    os.makedirs(FILTERS, exist_ok=True)
+    if adblock.lists(FILTERS):
+        interceptor = adblock.Interceptor(parent=profile)
+        profile.setUrlRequestInterceptor(interceptor)
+        threading.Thread(
+            target=lambda: setattr(interceptor, 'filters', adblock.load(FILTERS, os.path.join(DATA, 'filters.cache'))),
+            daemon=True
+        ).start()
+    return profile, page_handler
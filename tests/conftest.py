@@ -0,0 +1,27 @@
+import os
+import time
+
+import pytest
+
+
+# Qt tests run without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def wait_until(qapp):
+    # Runs the event loop until done() is true or timeout seconds pass, returning done()
+    from PySide6 import QtCore
+
+    def wait(done, timeout=5):
+        end = time.monotonic() + timeout
+        while not done() and time.monotonic() < end:
+            qapp.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 20)
+        return done()
+    return wait
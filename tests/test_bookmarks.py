@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip('PySide6.QtWidgets')
+
+from bookmarks import ROOT, BookmarkStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BookmarkStore(str(tmp_path / 'bookmarks.db'))
+    yield store
+    store.close()
+
+
+def tree(store, parent=ROOT):
+    # Folders as (title, [children]), bookmarks as (title, url, tags, added), in position order
+    return [
+        (title, tree(store, bookmark_id)) if url is None else (title, url, sorted((tags or '').split(',')), int(added))
+        for bookmark_id, title, url, _, added, tags in store.children(parent).fetchall()
+    ]
+
+
+def fill(store):
+    with store.db:
+        news = store.insert("News & <Views>", added=100)
+        store.insert('Quotes "here"', "https://q.test/?a=1&b=2", news, ["read", "later"], 101)
+        deep = store.insert("Deep", None, news, added=102)
+        store.insert("Ünïcode", "https://u.test/é", deep, added=103)
+        store.insert("Top", "https://top.test/", added=104)
+
+
+def test_export_import_round_trip(store, tmp_path):
+    fill(store)
+    path = str(tmp_path / 'bookmarks.html')
+    store.export_html(path)
+
+    copy = BookmarkStore(str(tmp_path / 'copy.db'))
+    assert copy.import_html(path) == 3
+    assert tree(copy) == tree(store)
+    assert copy.is_bookmarked("https://u.test/é")
+    assert copy.folder_path(copy.folder("News & <Views>/Deep")) == "News & <Views>/Deep"
+    copy.close()
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 64 * 1024])
+def test_import_is_the_same_in_any_chunk_size(store, tmp_path, chunk):
+    fill(store)
+    path = str(tmp_path / 'bookmarks.html')
+    store.export_html(path)
+    copy = BookmarkStore(str(tmp_path / f'copy{chunk}.db'))
+    copy.import_html(path, chunk=chunk)
+    assert tree(copy) == tree(store)
+    copy.close()
+
+
+def test_import_html_from_other_browsers(store, tmp_path):
+    path = tmp_path / 'export.html'
+    path.write_text(
+        "<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<!-- <A HREF=\"https://comment.test/\">no</A> -->\n"
+        "<DL><p>\n<DT><H3 ADD_DATE=\"5\" PERSONAL_TOOLBAR_FOLDER=\"true\">Toolbar</H3>\n<DL><p>\n"
+        "<DT><a href='https://a.test/' add_date=7 tags=\"x, y\">A &amp; B</a>\n"
+        "<DT><A HREF=\"javascript:alert(1)\">Bookmarklet</A>\n"
+        "<DT><A HREF=\"https://untitled.test/\"></A>\n"
+        "</DL><p>\n</DL><p>\n", encoding='utf-8'
+    )
+    assert store.import_html(str(path)) == 2
+    (folder, children), = tree(store)
+    assert folder == "Toolbar"
+    assert children[0] == ("A & B", "https://a.test/", ["x", "y"], 7)
+    assert children[1][:2] == ("https://untitled.test/", "https://untitled.test/")
+    assert len(children) == 2
+
+
+def test_lookups_follow_moves_and_removals(store):
+    fill(store)
+    store.add("Twice", "https://top.test/")
+    folder = store.folder("Archive/2024")
+    assert store.folder("Archive/2024") == folder
+    top = [row[0] for row in store.children().fetchall() if row[2] == "https://top.test/"]
+
+    store.move(top[:1], folder)
+    assert store.folder_path(store.get(top[0])[3]) == "Archive/2024"
+    store.remove(top[:1])
+    assert store.is_bookmarked("https://top.test/")
+    store.remove(top[1:])
+    assert not store.is_bookmarked("https://top.test/")
+
+    # Removing a folder takes everything inside it
+    store.remove([store.folder("News & <Views>")])
+    assert not store.is_bookmarked("https://u.test/é")
+    assert store.count() == 0
@@ -0,0 +1,44 @@
+import json
+
+import config
+
+
+def test_first_run_writes_only_the_choices(tmp_path):
+    path = tmp_path / 'config.json'
+    assert config.load(str(path))['name'] == 'default'
+    assert json.loads(path.read_text()) == {'preset': 'default', 'search': 'duckduckgo'}
+
+
+def test_overrides_merge_over_the_built_in_presets(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'preset': 'low-memory', 'presets': {
+        'low-memory': {'http_cache_size': 16, 'settings': {'PluginsEnabled': False}},
+        'kiosk': {'flags': ['--kiosk']},
+    }}))
+    loaded = config.load(str(path))
+    assert loaded['http_cache_size'] == 16
+    assert loaded['renderer_process_limit'] == config.PRESETS['low-memory']['renderer_process_limit']
+    assert loaded['settings']['PluginsEnabled'] is False
+    assert loaded['settings']['ScrollAnimatorEnabled'] is False
+    assert loaded['settings']['JavascriptCanPaste'] is True
+
+    # A built in preset changed later still reaches a file that only overrides part of it
+    monkeypatch.setitem(config.PRESETS['low-memory'], 'renderer_process_limit', 2)
+    assert config.load(str(path))['renderer_process_limit'] == 2
+
+    monkeypatch.setattr(config, 'preset', 'kiosk')
+    kiosk = config.load(str(path))
+    assert kiosk['flags'] == ['--kiosk'] and kiosk['http_cache'] == config.PRESETS['default']['http_cache']
+
+
+def test_unknown_preset_falls_back_to_default(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(config, 'preset', 'missing')
+    assert config.load(str(tmp_path / 'config.json'))['name'] == 'default'
+    assert "Unknown preset missing" in capsys.readouterr().err
+
+
+def test_chromium_flags(monkeypatch):
+    monkeypatch.setenv('QTWEBENGINE_CHROMIUM_FLAGS', '--experiment')
+    flags = config.chromium_flags(config.PRESETS['low-memory']).split()
+    assert flags[0] == '--experiment'
+    assert {'--process-per-site', '--renderer-process-limit=4', '--enable-low-end-device-mode'} <= set(flags)
@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+
+QtNetwork = pytest.importorskip('PySide6.QtNetwork')
+
+import connectivity
+from connectivity import ConnectivityMonitor
+
+
+@pytest.fixture
+def listener():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_reachable_host_is_online(qapp, wait_until, listener):
+    monitor = ConnectivityMonitor('127.0.0.1', listener, ttl=60000)
+    monitor.start()
+    assert wait_until(lambda: monitor.checked_at is not None)
+    assert monitor.is_online()
+    monitor.stop()
+
+
+def test_unreachable_host_goes_offline_once(qapp, wait_until, closed_port):
+    monitor = ConnectivityMonitor('127.0.0.1', closed_port, ttl=60000)
+    changes = []
+    monitor.changed.connect(changes.append)
+    monitor.probe()
+    assert wait_until(lambda: changes)
+    monitor.probe()
+    wait_until(lambda: monitor.socket is None)
+    assert changes == [False]
+    assert not monitor.is_online()
+
+
+def test_is_online_answers_from_cache_and_probes_when_stale(qapp, wait_until, listener):
+    monitor = ConnectivityMonitor('127.0.0.1', listener, ttl=0)
+    monitor.online = False
+    # The stale value comes back at once, the probe it starts fixes it later
+    assert monitor.is_online() is False
+    assert monitor.socket is not None
+    assert wait_until(lambda: monitor.online)
+    monitor.stop()
+
+
+def test_probe_gives_up_after_the_timeout(qapp, wait_until, monkeypatch):
+    # A socket that never hears back, as a silently dropped connection would
+    class Silent(QtNetwork.QTcpSocket):
+        def connectToHost(self, host, port):
+            pass
+
+    monkeypatch.setattr(connectivity.QtNetwork, 'QTcpSocket', Silent)
+    monitor = ConnectivityMonitor('127.0.0.1', 53, timeout=100)
+    monitor.probe()
+    assert wait_until(lambda: monitor.socket is None, timeout=2)
+    assert not monitor.online
@@ -0,0 +1,105 @@
+import csv
+import os
+
+import pytest
+
+from history import HistoryStore
+from models import HistoryModel, HistorySearchModel
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    yield store
+    store.close()
+
+
+def visits(store, count, when=1000.0):
+    with store.db:
+        return [store.insert(f"Page {i}", f"https://site{i % 7}.test/{i}", when + i // 2) for i in range(count)]
+
+
+def test_recent_pages_through_every_visit_once(store):
+    # Pairs of visits share a time, which keyset paging has to break by id
+    added = visits(store, 25)
+    pages, after = [], None
+    while rows := store.recent(10, after):
+        pages.append(rows)
+        after = rows[-1]
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [r[0] for p in pages for r in p] == [v[0] for v in sorted(added, key=lambda v: (v[3], v[0]), reverse=True)]
+
+
+def test_repeat_visits_update_the_url(store):
+    store.add("Old", "https://a.test/", 1)
+    store.add("New", "https://a.test/", 2)
+    assert store.frecency() == [("https://a.test/", "New", 2, 2)]
+    assert store.count() == 2
+
+
+def test_remove_returns_urls_with_no_visits_left(store):
+    first = store.add("A", "https://a.test/", 1)
+    second = store.add("A", "https://a.test/", 2)
+    other = store.add("B", "https://b.test/", 3)
+    assert store.remove([first[0]]) == []
+    assert store.frecency()[0] == ("https://a.test/", "A", 1, 2)
+    assert sorted(store.remove([second[0], other[0]])) == ["https://a.test/", "https://b.test/"]
+    assert store.count() == 0 and store.frecency() == []
+
+
+def test_search_filters_sorts_and_escapes(store):
+    store.add("100% done", "https://percent.test/", 1)
+    store.add("done", "https://plain.test/", 2)
+    store.add("b_c", "https://under.test/", 3)
+    store.add("abc", "https://abc.test/", 4)
+    assert [r[2] for r in store.search("100%")] == ["https://percent.test/"]
+    assert [r[2] for r in store.search("b_c")] == ["https://under.test/"]
+    assert [r[1] for r in store.search("", 'title', False)] == ["100% done", "abc", "b_c", "done"]
+    assert [r[1] for r in store.search("", 'time', True, limit=2, after=store.search("", limit=1)[0])] == ["b_c", "done"]
+
+
+@pytest.mark.parametrize('order', ['time', 'title', 'url'])
+@pytest.mark.parametrize('descending', [True, False])
+def test_search_pages_through_every_match_once(store, order, descending):
+    # Titles repeat in other cases and times are shared, both ties have to be broken by id
+    with store.db:
+        for i in range(40):
+            store.insert(["Alpha", "alpha", "Beta", "beta"][i % 4], f"https://site{i % 9}.test/{i}", 1000.0 + i // 3)
+    pages, after = [], None
+    while rows := store.search("e", order, descending, 7, after):
+        pages.append(rows)
+        after = rows[-1]
+    found = [r for p in pages for r in p]
+    assert found == store.search("e", order, descending, 100)
+    assert len(found) == 40 and len({r[0] for r in found}) == 40
+
+
+def test_import_csv_keeps_the_order(store, tmp_path):
+    path = tmp_path / 'history.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([["Title", "Url"], ["First", "https://1.test/"], ["Second", "https://2.test/"]])
+    store.import_csv(str(path))
+    assert [r[1] for r in store.recent(10)] == ["Second", "First"]
+    assert not path.exists() and os.path.exists(str(path) + '.bak')
+
+
+def test_clear(store):
+    visits(store, 5)
+    store.clear()
+    assert store.count() == 0 and store.recent(10) == [] and store.frecency() == []
+
+
+def test_removals_elsewhere_reach_the_search_model(qapp, store):
+    # Visits removed through the shared model leave every window, and the next page carries on after them
+    visits(store, 30)
+    history = HistoryModel(store, page=10)
+    search = HistorySearchModel(history)
+    assert len(search.rows) == 10
+    gone = [row[0] for row in search.rows[5:]]
+    history.remove_ids(gone)
+    assert len(search.rows) == 5 and not {row[0] for row in search.rows} & set(gone)
+    while search.canFetchMore():
+        search.fetchMore()
+    assert [row[0] for row in search.rows] == [row[0] for row in store.search(limit=100)]
+    search.remove_rows([0, 1])
+    assert len(search.rows) == 23 == store.count()
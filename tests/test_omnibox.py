@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+pytest.importorskip('PySide6.QtWidgets')
+
+from omnibox import WORD, FrecencyIndex
+
+
+def reference(index, text, limit):
+    # Every typed word starts a word of the url or title, best score first
+    tokens = WORD.findall(text.lower())
+    found = [
+        e for _, e in index.ranked
+        if all(any(word.startswith(t) for word in WORD.findall(e.text)) for t in tokens)
+    ]
+    return [e.url for e in found[:limit]] if tokens else []
+
+
+@pytest.fixture
+def index():
+    now = time.time()
+    index = FrecencyIndex()
+    index.load(
+        [(f"https://other{i}.test/", f"Other {i}", 1, now - i) for i in range(200)] +
+        [("https://www.example.com/", "Example Domain", 50, now), ("https://docs.python.org/3/", "Python docs", 5, now)]
+    )
+    return index
+
+
+@pytest.mark.parametrize('text', ['ther', 'ample', 'o', 'oth', 'other 1', 'exa', 'example.com', 'EXA dom', 'py 3', 'zzz', '', '  '])
+def test_dense_and_sparse_paths_agree(index, text):
+    # 'o' and 'oth' match most entries and walk the ranking, the rest go through the word postings
+    assert [e.url for e in index.search(text, 8)] == reference(index, text, 8)
+
+
+def test_frecency_orders_results(index):
+    assert index.search('e')[0].url == "https://www.example.com/"
+    index.visit("https://other5.test/", "Other 5", weight=2 ** 40)
+    assert index.search('other')[0].url == "https://other5.test/"
+
+
+def test_bookmarks_are_weighted_once(index):
+    before = index.entries["https://other9.test/"].score
+    index.bookmark("https://other9.test/", "Other 9")
+    after = index.entries["https://other9.test/"].score
+    index.bookmark("https://other9.test/", "Other 9")
+    assert after > before and index.entries["https://other9.test/"].score == after
+
+
+def test_retitled_entries_are_found_by_the_new_title_only(index):
+    index.visit("https://www.example.com/", "Sample page")
+    assert [e.url for e in index.search('sample')] == ["https://www.example.com/"]
+    assert index.search('domain') == []
+    assert 'domain' not in index.words
+
+
+def test_remove_and_clear(index):
+    index.remove("https://www.example.com/")
+    assert index.search('example') == []
+    assert 'example' not in index.words and 'example' not in index.sorted_words
+    assert len(index.ranked) == len(index) == 201
+    index.clear()
+    assert index.search('other') == [] and len(index) == 0
+
+
+def test_page_text_matches_arrive_after_the_keystroke(qapp, wait_until, tmp_path):
+    from PySide6 import QtWidgets
+    from omnibox import Omnibox
+    from pageindex import PageIndex
+
+    pages = PageIndex(str(tmp_path / 'pages.db'))
+    pages.add("https://deep.test/", "Deep", "an unusual phrase inside")
+    pages.jobs.join()
+    line_edit = QtWidgets.QLineEdit()
+    omnibox = Omnibox(line_edit, FrecencyIndex(), text_search=pages.search_later)
+
+    line_edit.setText("unusual")
+    line_edit.textEdited.emit("unusual")
+    assert omnibox.model.stringList() == []
+    assert wait_until(lambda: omnibox.model.stringList() == ["https://deep.test/"])
+
+    # Matches for text that has since changed are dropped
+    omnibox.typed = "other"
+    omnibox.add_pages("unusual", [("Stale", "https://stale.test/", "")])
+    assert "https://stale.test/" not in omnibox.model.stringList()
+    pages.close()
@@ -0,0 +1,73 @@
+import time
+import threading
+
+import pytest
+
+from pageindex import PageIndex, match_query
+
+
+def settle(index):
+    index.jobs.join()
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PageIndex(str(tmp_path / 'pages.db'), max_pages=3)
+    yield index
+    index.close()
+
+
+def test_match_query():
+    assert match_query("Rust's borrow-check") == '"Rust" "s" "borrow" "check"*'
+    assert match_query(" ?! ") is None
+
+
+def test_pages_are_searchable_once_written(index):
+    index.add("https://a.test/", "Borrow checker", "Lifetimes   and\n\nownership rules")
+    index.add("https://b.test/", "Gardening", "The borrowed trowel")
+    settle(index)
+    assert [url for _, url, _ in index.search("borrow")] == ["https://a.test/", "https://b.test/"]
+    assert [url for _, url, _ in index.search("owner")] == ["https://a.test/"]
+    assert index.search("lifetimes")[0][2] == "Lifetimes and ownership rules"
+
+
+def test_wants_answers_from_memory(index, tmp_path):
+    assert index.wants("https://a.test/")
+    index.add("https://a.test/", "A", "text")
+    assert not index.wants("https://a.test/")
+    index.forget(["https://a.test/"])
+    assert index.wants("https://a.test/")
+
+    index.add("https://b.test/", "B", "text")
+    settle(index)
+    reopened = PageIndex(str(tmp_path / 'pages.db'))
+    assert not reopened.wants("https://b.test/")
+    reopened.close()
+
+
+def test_oldest_pages_make_room(index):
+    for i in range(5):
+        index.add(f"https://{i}.test/", f"Page {i}", "shared words")
+        time.sleep(0.01)
+    settle(index)
+    assert sorted(url for _, url, _ in index.search("shared")) == ["https://2.test/", "https://3.test/", "https://4.test/"]
+    assert index.wants("https://0.test/") and not index.wants("https://4.test/")
+
+
+def test_clear(index):
+    index.add("https://a.test/", "A", "text")
+    index.clear()
+    settle(index)
+    assert index.search("text") == [] and index.wants("https://a.test/")
+
+
+def test_search_later_runs_off_the_calling_thread(index):
+    index.add("https://a.test/", "Async", "background search")
+    settle(index)
+    results = []
+    done = threading.Event()
+    index.search_later("backgr", 5, lambda text, rows: (results.append((text, rows, threading.current_thread())), done.set()))
+    assert done.wait(5)
+    text, rows, thread = results[0]
+    assert text == "backgr" and rows[0][1] == "https://a.test/"
+    assert thread is not threading.current_thread()
@@ -0,0 +1,119 @@
+import json
+import time
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip('PySide6.QtNetwork')
+
+import config
+from suggest import Suggester, parse
+
+
+class SuggestHandler(BaseHTTPRequestHandler):
+    # A stand-in OpenSearch suggestion endpoint, every suggestion continues the query
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)['q'][0]
+        self.server.queries.append(query)
+        time.sleep(self.server.delay)
+        body = json.dumps([query, [f"{query} one", f"{query} two"]]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-suggestions+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SuggestHandler)
+    server.daemon_threads = True
+    server.queries = []
+    server.delay = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/ac?q={{}}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def suggester(qapp, server):
+    suggester = Suggester(server.url, delay=30, timeout=300)
+    suggester.results = []
+    suggester.suggested.connect(lambda text, suggestions: suggester.results.append((text, suggestions)))
+    return suggester
+
+
+def test_parse():
+    assert parse(b'["py", ["python", 3, "pypi"], [], []]') == ['python', 'pypi']
+    assert parse(b'{"q": "py"}') is None
+    assert parse(b'["py"]') is None
+    assert parse(b'not json') is None
+
+
+def test_query_url_encodes_the_whole_query():
+    assert config.query_url('https://e.test/?q={}&x=1', 'a b&c/d') == 'https://e.test/?q=a%20b%26c%2Fd&x=1'
+
+
+def test_search_engine_from_config(tmp_path, capsys):
+    path = tmp_path / 'config.json'
+    assert config.search_engine(str(path))['name'] == 'duckduckgo'
+    assert json.loads(path.read_text())['search'] == 'duckduckgo'
+
+    path.write_text(json.dumps({'search': 'local', 'search_engines': {'local': {'search': 'http://127.0.0.1/?q={}'}}}))
+    assert config.search_engine(str(path)) == {'name': 'local', 'search': 'http://127.0.0.1/?q={}', 'suggest': None}
+
+    path.write_text(json.dumps({'search': 'missing'}))
+    assert config.search_engine(str(path))['name'] == 'duckduckgo'
+    assert "Unknown search engine missing" in capsys.readouterr().err
+
+
+def test_keystrokes_are_debounced_into_one_request(suggester, server, wait_until):
+    for i in range(1, 6):
+        suggester.request('python'[:i])
+    assert wait_until(lambda: suggester.results)
+    assert server.queries == ['pytho']
+    assert suggester.results == [('pytho', ['pytho one', 'pytho two'])]
+
+
+def test_cached_text_answers_at_once(suggester, server, wait_until):
+    suggester.request('web')
+    assert wait_until(lambda: suggester.results)
+    suggester.request('')
+    suggester.request('WEB ')
+    assert suggester.results[-1] == ('WEB', ['web one', 'web two'])
+    assert server.queries == ['web']
+
+
+def test_longest_cached_prefix_fills_in_while_waiting(suggester, server, wait_until):
+    suggester.request('web')
+    assert wait_until(lambda: suggester.results)
+    suggester.request('web t')
+    assert suggester.results[-1] == ('web t', ['web two'])
+    assert wait_until(lambda: len(suggester.results) == 3)
+    assert suggester.results[-1] == ('web t', ['web t one', 'web t two'])
+
+
+def test_new_text_cancels_the_request_in_flight(suggester, server, wait_until):
+    server.delay = 0.2
+    suggester.request('slow')
+    assert wait_until(lambda: server.queries)
+    suggester.request('slower')
+    assert wait_until(lambda: suggester.results)
+    wait_until(lambda: False, timeout=0.3)
+    assert [text for text, _ in suggester.results] == ['slower']
+
+
+def test_slow_endpoint_times_out_quietly(suggester, server, wait_until):
+    server.delay = 1
+    started = time.monotonic()
+    suggester.request('stuck')
+    assert wait_until(lambda: server.queries and suggester.reply is None)
+    assert time.monotonic() - started < 1
+    assert suggester.results == []
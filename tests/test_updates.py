@@ -0,0 +1,87 @@
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip('PySide6.QtNetwork')
+
+from updates import UpdateChecker
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    # Serves server.version with an ETag, answering 304 when it is sent back
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get('If-None-Match'))
+        time.sleep(server.delay)
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.version.encode()
+        self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), VersionHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.version = '0.2\n'
+    server.etag = '"a"'
+    server.delay = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/latest_version.txt"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def check(checker, wait_until, force=False):
+    results = []
+    checker.checked.connect(results.append)
+    checker.check(force)
+    assert wait_until(lambda: results)
+    checker.checked.disconnect(results.append)
+    return results[0]
+
+
+def test_fetches_and_caches_the_latest_version(qapp, wait_until, server, tmp_path):
+    cache = tmp_path / 'update.json'
+    assert check(UpdateChecker(server.url, str(cache)), wait_until) == 0.2
+    assert json.loads(cache.read_text())['latest'] == 0.2
+
+    # A new checker within the ttl answers from the file without a request
+    assert check(UpdateChecker(server.url, str(cache)), wait_until) == 0.2
+    assert len(server.requests) == 1
+
+
+def test_forced_check_revalidates_with_the_etag(qapp, wait_until, server, tmp_path):
+    checker = UpdateChecker(server.url, str(tmp_path / 'update.json'))
+    assert check(checker, wait_until) == 0.2
+    assert check(checker, wait_until, force=True) == 0.2
+    assert server.requests == [None, '"a"']
+
+
+def test_slow_server_times_out_to_none(qapp, wait_until, server, tmp_path):
+    server.delay = 1
+    checker = UpdateChecker(server.url, str(tmp_path / 'update.json'), timeout=100)
+    started = time.monotonic()
+    assert check(checker, wait_until) is None
+    assert time.monotonic() - started < 1
+
+
+def test_garbage_is_not_cached(qapp, wait_until, server, tmp_path):
+    server.version = '<html>'
+    cache = tmp_path / 'update.json'
+    assert check(UpdateChecker(server.url, str(cache)), wait_until) is None
+    assert not cache.exists()
@@ -0,0 +1,135 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import upgrade
+
+
+DATA = os.urandom(3 * 1024 * 1024 + 123)
+CHECKSUM = hashlib.sha256(DATA).hexdigest()
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    # /release/setup.exe redirects to a new signed url every time, like a release asset, the signed url
+    # serves DATA with ranges and /release/setup.exe.sha256 the checksum the server was given
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.respond(body=False)
+
+    def do_GET(self):
+        self.respond(body=True)
+
+    def respond(self, body):
+        server = self.server
+        server.requests.append((self.command, self.path, self.headers.get('Range')))
+        if self.path == '/release/setup.exe':
+            server.signatures += 1
+            self.send_response(302)
+            self.send_header('Location', f"/signed/setup.exe?sig={server.signatures}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/release/setup.exe.sha256':
+            if server.checksum is None:
+                self.send_error(404)
+                return
+            text = f"{server.checksum}  setup.exe\n".encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(text)))
+            self.end_headers()
+            self.wfile.write(text)
+        elif self.path.startswith('/signed/setup.exe?sig='):
+            start, end = 0, len(DATA) - 1
+            match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+            if match:
+                start, end = int(match[1]), min(int(match[2]), len(DATA) - 1)
+            self.send_response(206 if match else 200)
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(end - start + 1))
+            if match:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{len(DATA)}")
+            self.end_headers()
+            if body:
+                for i in range(start, end + 1, 64 * 1024):
+                    self.wfile.write(DATA[i:min(i + 64 * 1024, end + 1)])
+                    time.sleep(server.delay)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReleaseHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.signatures = 0
+    server.checksum = CHECKSUM
+    server.delay = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/release/setup.exe"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def ranges(server):
+    return [r for method, path, r in server.requests if method == 'GET' and path.startswith('/signed/')]
+
+
+def test_segmented_download(server, tmp_path):
+    path = str(tmp_path / 'setup.exe')
+    assert upgrade.download(server.url, path, upgrade.published_checksum(server.url), segments=4) == path
+    with open(path, 'rb') as f:
+        assert f.read() == DATA
+    assert len(ranges(server)) == 4
+    assert not os.path.exists(path + '.part') and not os.path.exists(path + '.part.json')
+
+
+def test_redirect_is_resolved_again_and_resume_survives_it(server, tmp_path):
+    # The first run is stopped partway, the second resolves a different signed url and only fetches the rest
+    path = str(tmp_path / 'setup.exe')
+    server.delay = 0.02
+    cancelled = threading.Event()
+    seen = []
+
+    def progress(done, total):
+        seen.append(done)
+        if done > len(DATA) // 4:
+            cancelled.set()
+
+    assert upgrade.download(server.url, path, CHECKSUM, progress, segments=2, cancelled=cancelled) is None
+    assert os.path.exists(path + '.part.json')
+    first = len(server.requests)
+
+    server.delay = 0
+    assert upgrade.download(server.url, path, CHECKSUM, segments=2) == path
+    with open(path, 'rb') as f:
+        assert f.read() == DATA
+    signed = {p for _, p, _ in server.requests if p.startswith('/signed/')}
+    assert len({p.split('=')[1] for p in signed}) > 1
+    resumed = [r for _, p, r in server.requests[first:] if p.startswith('/signed/') and r]
+    assert resumed and all(int(r.split('=')[1].split('-')[0]) > 0 for r in resumed)
+
+
+def test_checksum_mismatch_discards_the_download(server, tmp_path):
+    path = str(tmp_path / 'setup.exe')
+    server.checksum = '0' * 64
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        upgrade.download(server.url, path, upgrade.published_checksum(server.url))
+    assert not os.listdir(tmp_path)
+
+
+def test_missing_checksum_downloads_unverified(server, tmp_path):
+    server.checksum = None
+    assert upgrade.published_checksum(server.url) is None
+    path = str(tmp_path / 'setup.exe')
+    assert upgrade.download(server.url, path, None) == path